@@ -3,48 +3,70 @@
 
 from core.restrict_module import restrict_module
 restrict_module('streamlit',restricted_attributes=['secrets'])
+import contextlib
 import streamlit as st
 from core.business import get_current_view, check_rerun
 from core.components import (
-    render_auth, render_sidebar, render_journey_start, 
-    render_chapter_view, render_journey_failed, render_journey_completed, render_editor,
-    render_intro, render_challenge_view, render_chapters_view
+    sidebar_fragment,
+    view_auth, view_journey_start, view_intro, view_chapter, view_chapters,
+    view_challenge, view_journey_failed, view_journey_completed, view_editor
 )
 
-# Page config
-st.set_page_config(
-    page_title="On A Journey!",
-    page_icon="🧭"
-)
+# Opt-in profiling of the dispatch block (append ?profile=1 to the URL)
+try:
+    from streamlit_profiler import Profiler
+except ImportError:
+    Profiler = None
+
+# Page config (static - only needs to run on the first pass of a session)
+if not st.session_state.get("_page_configured"):
+    st.set_page_config(
+        page_title="On A Journey!",
+        page_icon="🧭"
+    )
+    st.session_state._page_configured = True
 
 # Initialize user
-user=st.session_state.setdefault('user',None)
-
-# Determine current view
-current_view = get_current_view(user)
-
-# View routing
-VIEWS = {
-    "auth": render_auth,
-    "journey_start": lambda: render_journey_start(user),
-    "intro": lambda: render_intro(user),
-    "chapter": lambda: render_chapter_view(user),  # Renommé: "day" → "chapter"
-    "chapters": lambda: render_chapters_view(user),
-    "challenge": lambda: render_challenge_view(user),
-    "journey_failed": lambda: render_journey_failed(user),
-    "journey_completed": lambda: render_journey_completed(user),
-    "editor": lambda: render_editor(user),
-}
-
-# Render sidebar for logged-in users
-if user and current_view != "auth":
-    render_sidebar(user)
-
-# Main content routing
-if current_view in VIEWS:
-    VIEWS[current_view]()
-else:
-    st.error(f"Unknown view: {current_view}")
-
-# Check for pending reruns
-check_rerun()
\ No newline at end of file
+st.session_state.setdefault('user',None)
+
+@st.fragment
+def main():
+    """Sidebar + view dispatch; widget interactions rerun only this body,
+    not the module-level setup above"""
+    user = st.session_state.user
+    current_view = get_current_view(user)
+
+    # Render sidebar for logged-in users
+    if user and current_view != "auth":
+        sidebar_fragment(user)
+
+    profiling = Profiler is not None and st.query_params.get("profile") == "1"
+
+    # Main content routing - if/elif ladder ordered by view frequency
+    with Profiler() if profiling else contextlib.nullcontext():
+        if current_view == "chapter":
+            view_chapter(user)
+        elif current_view == "chapters":
+            view_chapters(user)
+        elif current_view == "challenge":
+            view_challenge(user)
+        elif current_view == "journey_start":
+            view_journey_start(user)
+        elif current_view == "intro":
+            view_intro(user)
+        elif current_view == "editor":
+            view_editor(user)
+        elif current_view == "journey_completed":
+            view_journey_completed(user)
+        elif current_view == "journey_failed":
+            view_journey_failed(user)
+        elif current_view == "auth":
+            view_auth(user)
+        else:
+            # Dead branch once get_current_view is trusted; stripped under -O
+            assert False, f"Unknown view: {current_view}"
+
+    # Check for pending reruns
+    check_rerun()
+
+main()
@@ -1,53 +1,133 @@
 # business.py
 # Business logic for On a Journey!
+import sys
 import json
 import os
+import copy
+import time
+import atexit
+import threading
 import hashlib
-import glob
+import hmac
+import functools
+import importlib
+import importlib.util
 import streamlit as st
 import math
-from datetime import datetime, date, time, timedelta
+import numpy as np
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional, Any
 from zoneinfo import ZoneInfo
+from core.cache import session_memo
 from core.database import create_database
 from core.restrict_module import restrict_module
 
 # Database
-database = create_database()
+@st.cache_resource(show_spinner=False)
+def get_database():
+    """Process-wide database singleton, kept out of session_state so the
+    client handle is never walked by state serialization"""
+    return create_database()
 
 # ---------------------------- Navigation ---------------------------- #
 
-def rerun():
-    """Request a rerun from anywhere in the app"""
-    st.session_state.rerun = True
+# All view names the router knows about, as a frozenset for cheap membership
+VALID_VIEWS = frozenset({
+    "auth", "journey_start", "intro", "chapter", "chapters", "challenge",
+    "journey_failed", "journey_completed", "editor"
+})
+
+def rerun(scope: Optional[str] = None):
+    """Request a rerun from anywhere in the app.
+
+    Defaults to a fragment-scoped rerun when requested from inside a view
+    fragment, so only the affected view rerenders. Multiple requests made
+    during one script run coalesce into a single rerun.
+    """
+    already_pending = st.session_state.get('_rerun_gen', 0) != st.session_state.get('_rerun_gen_seen', 0)
+    st.session_state._rerun_gen = st.session_state.get('_rerun_gen', 0) + 1
+    if scope is None:
+        scope = "fragment" if st.session_state.get('_in_fragment') else "app"
+    if already_pending and st.session_state.get('_rerun_scope') == "app":
+        # Never narrow a pending app-scope request (e.g. a view change)
+        # down to a fragment rerun
+        scope = "app"
+    st.session_state._rerun_scope = scope
 
 def check_rerun():
-    """Check if rerun was requested and execute it"""
-    if st.session_state.get('rerun'):
-        st.session_state.rerun = False
-        st.rerun()
+    """Execute at most one rerun if any were requested this script run"""
+    gen = st.session_state.get('_rerun_gen', 0)
+    if gen != st.session_state.get('_rerun_gen_seen', 0):
+        st.session_state._rerun_gen_seen = gen
+        scope = st.session_state.get('_rerun_scope', "app")
+        if scope == "fragment" and not st.session_state.get('_in_fragment'):
+            # Fragment-scoped reruns can only fire from inside their fragment
+            scope = "app"
+        st.rerun(scope=scope)
 
 def set_view(view: str):
     """Change current view"""
+    assert view in VALID_VIEWS, f"Unknown view: {view}"
     st.session_state.view = view
-    rerun()
+    rerun(scope="app")  # Routing happens outside fragments
 
-def get_current_view(user: Optional[dict] = None) -> str:
-    """Determine current view based on app state"""
-    if "view" not in st.session_state:
-        st.session_state.view = "auth"
-    
-    # Auto-redirect logic
-    if st.session_state.view == "auth" and user:
-        if not user.get("start_date"):
+def goto(view: str):
+    """Change view from a widget callback.
+
+    Unlike set_view, this doesn't request a rerun: the script run that
+    follows a widget callback already repaints with the new view.
+    """
+    assert view in VALID_VIEWS, f"Unknown view: {view}"
+    st.session_state.view = view
+
+def bump_state_version():
+    """Invalidate memoized view routing after a user mutation"""
+    st.session_state.state_version = st.session_state.get("state_version", 0) + 1
+
+@dataclass(frozen=True, slots=True)
+class UserRef:
+    """Small immutable identity token for a user session.
+
+    The full user document stays a plain dict (it round-trips through
+    TinyDB/Mongo and the challenge namespace as-is); this token carries
+    the few fields caches and state diffs actually need.
+    """
+    username: Optional[str] = None
+    version: int = 0
+    started: bool = False
+    intro_shown: bool = False
+
+def user_ref(user: Optional[dict]) -> UserRef:
+    """Build the lightweight token for the current user/session state"""
+    return UserRef(
+        username=user.get("username") if user else None,
+        version=st.session_state.get("state_version", 0),
+        started=bool(user.get("start_date")) if user else False,
+        intro_shown=bool(user.get("intro_shown")) if user else False,
+    )
+
+@session_memo
+def _resolve_view(view: str, ref: UserRef) -> str:
+    """Auto-redirect logic, memoized per session on the cheap user token"""
+    if view == "auth" and ref.username:
+        if not ref.started:
             return "journey_start"
         else:
-            if not user.get("intro_shown"):
+            if not ref.intro_shown:
                 return "intro"
             else:
                 return "chapters"
-    
-    return st.session_state.view
+
+    return view
+
+def get_current_view(user: Optional[dict] = None) -> str:
+    """Determine current view based on app state"""
+    if "view" not in st.session_state:
+        st.session_state.view = "auth"
+
+    return _resolve_view(st.session_state.view, user_ref(user))
 
 def mark_intro_shown(user: dict):
     """Mark intro as shown for this journey"""
@@ -57,18 +137,44 @@ def mark_intro_shown(user: dict):
 # ---------------------------- Auth ---------------------------- #
 
 def hash_password(password: str, salt: Optional[str] = None) -> tuple[str, str]:
+    """Derive a scrypt hash for the password; returns (salt, hash) hex strings"""
     if not salt:
         salt = hashlib.sha256(os.urandom(32)).hexdigest()
-    pw_hash = hashlib.sha256((salt + password).encode()).hexdigest()
+    pw_hash = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt),
+                             n=2**14, r=8, p=1, dklen=32).hex()
     return salt, pw_hash
 
-def verify_password(password: str, salt: str, pw_hash: str) -> bool:
-    return hashlib.sha256((salt + password).encode()).hexdigest() == pw_hash
+@functools.lru_cache(maxsize=128)
+def _sha256_salt_template(salt: str):
+    """Hash object pre-fed with the salt, for legacy sha256 verification.
+
+    Copied per call, so repeated attempts against the same account skip
+    re-hashing the salt prefix and the salt+password string concat.
+    """
+    return hashlib.sha256(salt.encode())
+
+def verify_password(password: str, salt: str, pw_hash: str, kdf: str = "scrypt") -> bool:
+    if kdf == "scrypt":
+        candidate = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt),
+                                   n=2**14, r=8, p=1, dklen=32).hex()
+    else:
+        # Legacy accounts created before the KDF switch. Feeding salt and
+        # password separately is byte-identical to sha256(salt + password):
+        # UTF-8 encodes concatenations to concatenated bytes.
+        h = _sha256_salt_template(salt).copy()
+        h.update(password.encode())
+        candidate = h.hexdigest()
+    return hmac.compare_digest(candidate, pw_hash)
 
 # ---------------------------- Users & Achievements ---------------------------- #
 
 def get_user(username: str) -> Optional[dict]:
-    return database.get_user(username)
+    # Queued-but-unwritten snapshot wins over the database copy
+    with _WRITE_LOCK:
+        pending = _PENDING_WRITES.get(username)
+        if pending is not None:
+            return copy.deepcopy(pending)
+    return get_database().get_user(username)
 
 def create_user(username: str, password: str) -> dict:
     salt, pw_hash = hash_password(password)
@@ -76,6 +182,7 @@ def create_user(username: str, password: str) -> dict:
         "username": username,
         "salt": salt,
         "pw_hash": pw_hash,
+        "kdf": "scrypt",
         "start_date": None,
         "chapters": {},
         "active_journey_data": None,
@@ -87,10 +194,139 @@ def create_user(username: str, password: str) -> dict:
         "achievements": {},
         "timezone": "Europe/Paris"  # Default timezone
     }
-    return database.create_user(user)
+    return get_database().create_user(user)
+
+# Latest-wins queue of user documents awaiting persistence, drained by a
+# daemon thread so the database write (and its fsync) stays off the render
+# path. Reads go through the queue first, so the process keeps
+# read-after-write consistency.
+_PENDING_WRITES: Dict[str, dict] = {}
+_WRITE_LOCK = threading.Lock()
+_WRITE_WAKE = threading.Event()
+
+def _writer_loop(database):
+    while True:
+        _WRITE_WAKE.wait()
+        _WRITE_WAKE.clear()
+        # Brief grace period so the several updates of one rerun coalesce
+        # into a single write per user
+        time.sleep(0.05)
+        while True:
+            with _WRITE_LOCK:
+                if not _PENDING_WRITES:
+                    break
+                _, snapshot = _PENDING_WRITES.popitem()
+            database.update_user(snapshot)
+
+@st.cache_resource(show_spinner=False)
+def _get_writer() -> threading.Thread:
+    """Start the (process-wide) background writer on first use"""
+    atexit.register(flush_pending_writes)
+    thread = threading.Thread(target=_writer_loop, args=(get_database(),),
+                              daemon=True, name="user-writer")
+    thread.start()
+    return thread
+
+def flush_pending_writes():
+    """Synchronously drain queued user writes (process exit, logout)"""
+    database = get_database()
+    while True:
+        with _WRITE_LOCK:
+            if not _PENDING_WRITES:
+                return
+            _, snapshot = _PENDING_WRITES.popitem()
+        database.update_user(snapshot)
 
 def update_user(user: dict):
-    database.update_user(user)
+    if user.get("_defer_persist"):
+        # Inside batched_updates: remember the write, persist on exit
+        user["_pending_persist"] = True
+        return
+    user["_rev"] = user.get("_rev", 0) + 1  # Cheap version counter for caches
+    _get_writer()
+    # Snapshot the document: the writer serializes it off-thread while the
+    # script may keep mutating the live dict
+    snapshot = {k: copy.deepcopy(v) for k, v in user.items()
+                if k not in ("_defer_persist", "_pending_persist")}
+    with _WRITE_LOCK:
+        _PENDING_WRITES[user["username"]] = snapshot
+    _WRITE_WAKE.set()
+    bump_state_version()
+
+@contextmanager
+def batched_updates(user: dict):
+    """Coalesce update_user calls into a single database write.
+
+    Challenge code can unlock many achievements in one execution; without
+    batching each unlock costs a full DB write. Nested batches are no-ops.
+    """
+    if user.get("_defer_persist"):
+        yield  # Already inside a batch
+        return
+
+    user["_defer_persist"] = True
+    try:
+        yield
+    finally:
+        user.pop("_defer_persist", None)
+        if user.pop("_pending_persist", False):
+            update_user(user)
+
+def _user_cache(user: dict) -> dict:
+    """Per-session scratch cache for derived user data (XP, level index,
+    accessibility). Reset whenever the user document's revision changes."""
+    key = (user.get("username"), user.get("_rev", 0))
+    cache = st.session_state.get("_user_cache")
+    if cache is None or cache["key"] != key:
+        cache = {"key": key}
+        st.session_state._user_cache = cache
+    return cache
+
+def _user_arrays(user: dict) -> dict:
+    """Derived SoA view of the user's chapter records as parallel numpy
+    arrays, rebuilt lazily once per user revision. The str-keyed dict of
+    records stays the serialization form; hot reductions read these."""
+    cache = _user_cache(user)
+    if "arrays" in cache:
+        return cache["arrays"]
+
+    journey = get_active_journey(user)
+    journey_chapters = journey["chapters"] if journey else {}
+    chapters_data = user.get("chapters", {})
+
+    validated = []
+    in_journey = []
+    level = []      # required_level with default 1 (journey rule)
+    level_xp = []   # required_level with chapter_num fallback (XP rule)
+    ratio = []      # weighted challenge completion ratio
+
+    for chapter_str, record in chapters_data.items():
+        chapter_num = int(chapter_str)
+        journey_chapter = journey_chapters.get(chapter_num)
+
+        validated.append(bool(record.get("validated", False)))
+        in_journey.append(journey_chapter is not None)
+        jc = journey_chapter or {}
+        level.append(jc.get("required_level", 1))
+        level_xp.append(jc.get("required_level", chapter_num))
+
+        challenges = record.get("challenges", [])
+        weights = [get_challenge_weight(ch.get("difficulty", "easy")) for ch in challenges]
+        total_weight = sum(weights)
+        if total_weight:
+            done = sum(w for w, ch in zip(weights, challenges) if ch.get("completed", False))
+            ratio.append(done / total_weight)
+        else:
+            ratio.append(0.0)
+
+    cache["arrays"] = {
+        "validated": np.asarray(validated, dtype=np.bool_),
+        "in_journey": np.asarray(in_journey, dtype=np.bool_),
+        "level": np.asarray(level, dtype=np.int32),
+        "level_xp": np.asarray(level_xp, dtype=np.int32),
+        "completion_ratio": np.asarray(ratio, dtype=np.float64),
+    }
+    return cache["arrays"]
 
 def has_achievements(user: dict, required_achievements: List[str]) -> bool:
     """Check if user has all required achievements"""
@@ -117,11 +353,17 @@ def unlock_achievement(user: dict, achievement_id: str, title: str = None, descr
 
 # ---------------------------- Time helpers ---------------------------- #
 
+# ZoneInfo instances per timezone name; zoneinfo caches internally but the
+# constructor probe still costs more than this dict hit, and get_timezone
+# runs inside every accessibility/credits pass
+_TZ_CACHE: Dict[str, ZoneInfo] = {}
+
 def get_timezone(user: Optional[dict]=None) -> ZoneInfo:
-    if user:
-        return ZoneInfo(user.get("timezone", "Europe/Paris"))
-    else:
-        return ZoneInfo("Europe/Paris")
+    name = user.get("timezone", "Europe/Paris") if user else "Europe/Paris"
+    tz = _TZ_CACHE.get(name)
+    if tz is None:
+        tz = _TZ_CACHE[name] = ZoneInfo(name)
+    return tz
 
 def today(user: dict = None) -> date:
     tz = get_timezone(user)
@@ -132,12 +374,13 @@ def now(user: dict = None) -> datetime:
     return datetime.now(tz)
 
 def is_day_elapsed(target_date: date,user:dict=None) -> bool:
-    """True if target_date is fully elapsed (past 23:59:59) or if god mode is active"""
+    """True if target_date is fully elapsed (a later day has started in the
+    user's timezone) or if god mode is active"""
     if st.session_state.get("god_mode", False):
         return True
-    
-    end_of_target = datetime.combine(target_date, time(23, 59, 59), tzinfo=get_timezone(user))
-    return now(user) > end_of_target
+
+    # Plain date comparison; no end-of-day datetime to build and localize
+    return today(user) > target_date
 
 # ---------------------------- XP et Niveaux ---------------------------- #
 
@@ -157,13 +400,18 @@ def get_level_bounds(level: int) -> tuple[float, float]:
     
     return (min_xp, max_xp)
 
-def get_xp_progress(user: dict) -> dict:
-    """Get XP progression info for display"""
-    total_xp = calculate_total_xp(user)
-    current_level = calculate_level(total_xp)
-    min_xp, max_xp = get_level_bounds(current_level)
+@functools.lru_cache(maxsize=1024)
+def xp_progress(total_xp: float) -> dict:
+    """Level and level bounds for an XP total, fused into a single frame.
+
+    XP only moves in discrete increments between mutations, so caching on
+    the (rounded) total hits across reruns and sessions alike.
+    """
+    current_level = 1 if total_xp <= 0 else int(0.5 + 0.5 * math.sqrt(1 + (16/3) * total_xp))
+    min_xp = 0.75 * (current_level - 1) * current_level
+    max_xp = min_xp + 1.5 * current_level
     progress_in_level = (total_xp - min_xp) / (max_xp - min_xp) if max_xp > min_xp else 0.0
-    
+
     return {
         "total_xp": total_xp,
         "current_level": current_level,
@@ -173,81 +421,158 @@ def get_xp_progress(user: dict) -> dict:
         "xp_to_next": max_xp - total_xp
     }
 
+def get_xp_progress(user: dict) -> dict:
+    """Get XP progression info for display"""
+    cache = _user_cache(user)
+    if "progress" not in cache:
+        cache["progress"] = xp_progress(round(calculate_total_xp(user), 6))
+    return cache["progress"]
+
 # ---------------------------- Accessibility Logic (CENTRALIZED) ---------------------------- #
 
-def is_chapter_accessible(user: dict, chapter_num: int) -> dict:
-    """Check if a chapter is accessible to the user"""
-    
+def get_all_chapter_accessibility(user: dict) -> Dict[int, dict]:
+    """Compute accessibility for every chapter in one journey-wide sweep.
+
+    XP, the normalized journey and the per-level commitment map are each
+    computed once instead of per chapter; the result is session-cached per
+    user revision so grid renders cost a single dict lookup.
+    """
+    cache = _user_cache(user)
+    if "accessibility" in cache:
+        return cache["accessibility"]
+
     journey = get_active_journey(user)
-    if not journey or chapter_num not in journey["chapters"]:
-        return {"accessible": False, "reason": "invalid_chapter"}
-    
-    journey_chapter = journey["chapters"][chapter_num]
+    if not journey:
+        cache["accessibility"] = {}
+        return cache["accessibility"]
+
     user_level = get_xp_progress(user)["current_level"]
-    required_level = journey_chapter.get("required_level", 1)
-    required_achievements = journey_chapter.get("depends_on", [])
     user_achievements = user.get("achievements", {})
-    
-    # Check level requirement
-    if user_level < required_level:
-        return {
-            "accessible": False,
-            "reason": "insufficient_level",
-            "required_level": required_level,
-            "user_level": user_level,
-            "missing_achievements": []
-        }
-    
-    # Check achievement requirements
-    missing_achievements = [ach for ach in required_achievements if ach not in user_achievements]
-    if missing_achievements:
-        return {
-            "accessible": False,
-            "reason": "missing_achievements",
-            "missing_achievements": missing_achievements,
-            "required_level": required_level,
-            "user_level": user_level
-        }
-    
-    # AJOUTER : Check commitment rules
-    committed_chapter = get_committed_chapter_for_level(user, required_level)
-    if committed_chapter is not None and committed_chapter != chapter_num:
-        return {
-            "accessible": False,
-            "reason": "committed_elsewhere",
-            "committed_chapter": committed_chapter,
+    chapters_data = user.get("chapters", {})
+
+    # Committed chapter per level, single pass over the level index
+    committed_by_level = {}
+    for level, chapter_nums in get_chapters_by_level(user).items():
+        for chapter_num in chapter_nums:
+            if _has_completed_challenge(chapters_data.get(str(chapter_num), {})):
+                committed_by_level[level] = chapter_num
+                break
+
+    result = {}
+    for chapter_num, journey_chapter in get_journey_items(user):
+        required_level = journey_chapter.get("required_level", 1)
+        required_achievements = journey_chapter.get("depends_on", [])
+        committed_chapter = committed_by_level.get(required_level)
+
+        # Check level requirement
+        if user_level < required_level:
+            result[chapter_num] = {
+                "accessible": False,
+                "reason": "insufficient_level",
+                "required_level": required_level,
+                "user_level": user_level,
+                "missing_achievements": []
+            }
+            continue
+
+        # Check achievement requirements
+        missing_achievements = [ach for ach in required_achievements if ach not in user_achievements]
+        if missing_achievements:
+            result[chapter_num] = {
+                "accessible": False,
+                "reason": "missing_achievements",
+                "missing_achievements": missing_achievements,
+                "required_level": required_level,
+                "user_level": user_level
+            }
+            continue
+
+        # Check commitment rules
+        if committed_chapter is not None and committed_chapter != chapter_num:
+            result[chapter_num] = {
+                "accessible": False,
+                "reason": "committed_elsewhere",
+                "committed_chapter": committed_chapter,
+                "required_level": required_level,
+                "user_level": user_level,
+                "missing_achievements": []
+            }
+            continue
+
+        result[chapter_num] = {
+            "accessible": True,
+            "reason": "all_conditions_met",
+            "missing_achievements": [],
             "required_level": required_level,
             "user_level": user_level,
-            "missing_achievements": []
+            "committed_chapter": committed_chapter
         }
-    
-    return {
-        "accessible": True,
-        "reason": "all_conditions_met",
-        "missing_achievements": [],
-        "required_level": required_level,
-        "user_level": user_level,
-        "committed_chapter": committed_chapter
-    }
 
-def is_challenge_accessible(user: dict, chapter_num: int, challenge_idx: int) -> dict:
+    cache["accessibility"] = result
+    return result
+
+@dataclass
+class AccessCtx:
+    """Shared per-render context for accessibility queries.
+
+    Built once per loop so repeated queries don't re-resolve the journey,
+    XP info and accessibility sweep for every chapter/challenge.
+    """
+    journey: Optional[dict]
+    xp_info: dict
+    chapters_data: dict
+    accessibility: Dict[int, dict]
+
+def build_access_ctx(user: dict) -> AccessCtx:
+    """Build the shared context for a batch of accessibility queries"""
+    return AccessCtx(
+        journey=get_active_journey(user),
+        xp_info=get_xp_progress(user),
+        chapters_data=user.get("chapters", {}),
+        accessibility=get_all_chapter_accessibility(user),
+    )
+
+def is_chapter_accessible(user: dict, chapter_num: int, ctx: Optional[AccessCtx] = None) -> dict:
+    """Check if a chapter is accessible to the user"""
+    if ctx is None:
+        ctx = build_access_ctx(user)
+
+    if not ctx.journey or chapter_num not in ctx.journey["chapters"]:
+        return {"accessible": False, "reason": "invalid_chapter"}
+
+    return ctx.accessibility[chapter_num]
+
+def chapter_accessible_bool(user: dict, chapter_num: int, ctx: Optional[AccessCtx] = None) -> bool:
+    """Accessibility probe for callers that only need the yes/no answer.
+
+    Reads the precomputed sweep without constructing any denial dict, so
+    loops over many chapters stay allocation-free.
+    """
+    accessibility = ctx.accessibility if ctx is not None else get_all_chapter_accessibility(user)
+    entry = accessibility.get(chapter_num)
+    return entry is not None and entry["accessible"]
+
+def is_challenge_accessible(user: dict, chapter_num: int, challenge_idx: int,
+                            ctx: Optional[AccessCtx] = None) -> dict:
     """Check if a specific challenge is accessible to the user"""
+    if ctx is None:
+        ctx = build_access_ctx(user)
+
     # First check if chapter is accessible
-    chapter_access = is_chapter_accessible(user, chapter_num)
+    chapter_access = is_chapter_accessible(user, chapter_num, ctx)
     if not chapter_access["accessible"]:
         return chapter_access
-    
-    journey = get_active_journey(user)
+
     chapter_record = get_chapter_record(user, chapter_num)
     challenges = chapter_record.get("challenges", [])
-    
+
     if challenge_idx >= len(challenges):
         return {"accessible": False, "reason": "invalid_challenge"}
-    
+
     challenge = challenges[challenge_idx]
     required_achievements = challenge.get("depends_on", [])
     user_achievements = user.get("achievements", {})
-    
+
     # Check challenge-specific achievement requirements
     missing_achievements = [ach for ach in required_achievements if ach not in user_achievements]
     if missing_achievements:
@@ -256,61 +581,109 @@ def is_challenge_accessible(user: dict, chapter_num: int, challenge_idx: int) ->
             "reason": "missing_achievements",
             "missing_achievements": missing_achievements
         }
-    
-    # Check commitment rules
-    journey_chapter = journey["chapters"][chapter_num]
-    required_level = journey_chapter.get("required_level", 1)
-    committed_chapter = get_committed_chapter_for_level(user, required_level)
-    
-    if committed_chapter is not None and committed_chapter != chapter_num:
-        return {"accessible": False, "reason": "committed_elsewhere"}
-    
+
+    # Commitment is already enforced by the chapter-level check above:
+    # an accessible chapter is never committed elsewhere
     return {"accessible": True, "reason": "all_conditions_met"}
 
 # ---------------------------- Journeys ---------------------------- #
 
-def get_available_journeys(user: Optional[dict] = None) -> List[dict]:
-    """Get journeys from both filesystem (official) and user DB (personal)"""
+# Fast JSON parsing/serialization when orjson is installed; stdlib otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+def _scan_journey_files() -> List[str]:
+    """List journeys/*.json via os.scandir (single syscall, no fnmatch)"""
+    try:
+        with os.scandir("journeys") as it:
+            return [e.path for e in it if e.name.endswith(".json") and e.is_file()]
+    except FileNotFoundError:
+        return []
+
+def _journey_header(name: str, source: str, file_path: Optional[str], data: dict) -> dict:
+    """Lightweight listing entry - just what the selection UIs display.
+
+    The intro/success texts and per-challenge code blobs stay unparsed
+    until the journey is actually activated or edited."""
+    return {
+        "name": name,
+        "source": source,
+        "file_path": file_path,
+        "title": data.get("title", ""),
+        "description": data.get("description", ""),
+        "chapter_count": len(data.get("chapters", data.get("days", {})))
+    }
+
+@st.cache_data(show_spinner=False, ttl=24*60*60)
+def _load_official_journeys(sig: tuple) -> List[dict]:
+    """Load listing headers for official journey files.
+
+    sig is a tuple of (path, mtime) pairs: editing a file changes its mtime
+    and thus the cache key, so stale entries invalidate themselves.
+    """
     journeys = []
-    
-    # 1. Official journeys from filesystem
-    journey_files = glob.glob("journeys/*.json")
-    for file_path in journey_files:
+    for file_path, _mtime in sig:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
+            with open(file_path, 'rb') as f:
+                data = _json_loads(f.read())
+
             journey_name = os.path.basename(file_path).replace('.json', '')
-            journey_structure = normalize_journey_structure(data)
-            
-            journeys.append({
-                "name": journey_name,
-                "source": "official",  # ← NOUVEAU
-                "file_path": file_path,
-                "journey_structure": journey_structure,
-                "chapter_count": len(journey_structure["chapters"])
-            })
+            journeys.append(_journey_header(journey_name, "official", file_path, data))
         except Exception as e:
             print(f"Error loading official journey {file_path}: {e}")
-    
+
+    return journeys
+
+@st.cache_data(show_spinner=False, ttl=24*60*60)
+def _load_personal_journeys(username: str, sig: int, _custom_journeys: dict = None) -> List[dict]:
+    """Build listing headers for a user's custom journeys, keyed on a content
+    hash so the (unhashable) journey dicts themselves stay out of the cache key"""
+    journeys = []
+    for name, journey_data in (_custom_journeys or {}).items():
+        try:
+            header = _journey_header(name, "personal", None, journey_data)
+            header["created_at"] = journey_data.get("created_at")
+            header["modified_at"] = journey_data.get("modified_at")
+            journeys.append(header)
+        except Exception as e:
+            print(f"Error loading personal journey {name}: {e}")
+
+    return journeys
+
+def load_journey_structure(journey: dict, user: Optional[dict] = None) -> dict:
+    """Parse and normalize the full structure behind a listing entry"""
+    if journey["source"] == "official":
+        with open(journey["file_path"], 'rb') as f:
+            return normalize_journey_structure(_json_loads(f.read()))
+
+    custom_journeys = (user or {}).get("custom_journeys", {})
+    return normalize_journey_structure(custom_journeys.get(journey["name"], {}))
+
+@st.cache_data(show_spinner=False, ttl=5)
+def _journeys_sig() -> tuple:
+    """(path, mtime) signature of the journeys directory, refreshed at most
+    every few seconds so selectbox interactions don't re-stat every file"""
+    return tuple(sorted((p, os.path.getmtime(p)) for p in _scan_journey_files()))
+
+def get_available_journeys(user: Optional[dict] = None) -> List[dict]:
+    """Get journeys from both filesystem (official) and user DB (personal)"""
+
+    # 1. Official journeys from filesystem (cached; st.cache_data hands back
+    # a fresh copy each call, so downstream mutation is safe)
+    journeys = _load_official_journeys(_journeys_sig())
+
     # 2. Personal journeys from user database  ← NOUVEAU BLOC
     if user:
         custom_journeys = user.get("custom_journeys", {})
-        for name, journey_data in custom_journeys.items():
-            try:
-                journey_structure = normalize_journey_structure(journey_data)
-                journeys.append({
-                    "name": name,
-                    "source": "personal",  # ← NOUVEAU
-                    "file_path": None,     # Pas de fichier
-                    "journey_structure": journey_structure,
-                    "chapter_count": len(journey_structure["chapters"]),
-                    "created_at": journey_data.get("created_at"),      # ← NOUVEAU
-                    "modified_at": journey_data.get("modified_at")     # ← NOUVEAU
-                })
-            except Exception as e:
-                print(f"Error loading personal journey {name}: {e}")
-    
+        if custom_journeys:
+            # The document revision moves on every persisted change, so it
+            # stands in for hashing the journeys' content
+            journeys.extend(_load_personal_journeys(user["username"], user.get("_rev", 0), custom_journeys))
+
     return journeys
 
 def normalize_journey_structure(raw_data: Any) -> dict:
@@ -337,53 +710,76 @@ def normalize_journey_structure(raw_data: Any) -> dict:
 def _normalize_chapters_data(raw_chapters: Any) -> Dict[int, dict]:
     """Convert various JSON formats to normalized chapter structure"""
     result = {}
-    
+    normalize = _normalize_chapter_data  # Pre-bound: skip global lookups in the loop
+
     if isinstance(raw_chapters, list):
         for i, item in enumerate(raw_chapters, 1):
             if isinstance(item, dict):
                 chapter_num = int(item.get("chapter", item.get("day", i)))
-                result[chapter_num] = _normalize_chapter_data(item)
-    
+                result[chapter_num] = normalize(item)
+
     elif isinstance(raw_chapters, dict):
         for key, item in raw_chapters.items():
             if isinstance(item, dict):
-                chapter_num = int(key)
-                result[chapter_num] = _normalize_chapter_data(item)
-    
+                result[int(key)] = normalize(item)
+
     return result
 
 def _normalize_chapter_data(chapter_data: dict) -> dict:
-    """Normalize a single chapter's data"""
+    """Normalize a single chapter's data.
+
+    Hot path for large journeys: `.get` is bound once per dict so each
+    field costs one lookup instead of an attribute probe plus a lookup.
+    The output stays a plain dict - records round-trip through the DB and
+    the rest of the code accesses them by key.
+    """
     challenges = []
+    append = challenges.append
     for ch in chapter_data.get("challenges", []):
-        challenges.append({
-            "title": ch.get("title", "Challenge"),
-            "description": ch.get("description", ""),
-            "image":ch.get("image",None),
-            "difficulty": ch.get("difficulty", "easy"),
-            "code": ch.get('code', ""),
+        get = ch.get
+        append({
+            "title": get("title", "Challenge"),
+            "description": get("description", ""),
+            "image": get("image", None),
+            # Interned: JSON decoding allocates a fresh "easy"/"medium"/...
+            # per challenge; interning collapses them to shared singletons
+            # so weight lookups and the validator's set test compare by
+            # pointer. Non-strings pass through for the validator to flag.
+            "difficulty": sys.intern(d) if isinstance(d := get("difficulty", "easy"), str) else d,
+            "code": get('code', ""),
             "completed": False,
-            "depends_on": ch.get("depends_on", [])
+            "depends_on": get("depends_on", [])
         })
-    
+
+    get = chapter_data.get
     return {
-        "title": chapter_data.get("title", ""),
-        "description": chapter_data.get("description", ""),
-        "image": chapter_data.get("image",None),
-        "intro": chapter_data.get("intro", ""),
+        "title": get("title", ""),
+        "description": get("description", ""),
+        "image": get("image", None),
+        "intro": get("intro", ""),
         "challenges": challenges,
-        "required_level": chapter_data.get("required_level", 1),
-        "depends_on": chapter_data.get("depends_on", [])
+        "required_level": get("required_level", 1),
+        "depends_on": get("depends_on", [])
     }
 
-def set_user_journey(user: dict, journey: dict):
-    """Set a journey as active for the user"""
-    user["active_journey_data"] = journey["journey_structure"]
+def set_user_journey(user: dict, journey_structure: dict):
+    """Set an already-loaded journey structure as active for the user"""
+    user["active_journey_data"] = journey_structure
     update_user(user)
 
 def get_active_journey(user: dict) -> Optional[dict]:
     """Get the currently active journey"""
     journey_data = user.get("active_journey_data")
+    if journey_data is None:
+        return None
+
+    # Skip the key probe/rewrite if this exact object was already
+    # normalized. Identity of the in-memory dict is the sentinel: it holds
+    # across revision bumps but naturally breaks when the document is
+    # reloaded from the database (which re-stringifies the keys), so it
+    # can't go stale the way a persisted flag on the journey dict would.
+    if st.session_state.get("_normalized_journey") is journey_data:
+        return journey_data
 
     if journey_data and "chapters" in journey_data:
         # Ensure keys are integers
@@ -397,9 +793,45 @@ def get_active_journey(user: dict) -> Optional[dict]:
             chapters = {int(k): v for k, v in chapters.items()}
         journey_data["chapters"] = chapters
         del journey_data["days"]
-    
+
+    st.session_state._normalized_journey = journey_data
     return journey_data
 
+def get_journey_items(user: dict) -> tuple:
+    """Chapter (num, data) pairs of the active journey, sorted by number.
+
+    Sorted once per user revision (session-cached); the full-journey sweeps
+    iterate this tuple instead of re-walking and re-sorting the chapters
+    dict on every call.
+    """
+    journey = get_active_journey(user)
+    if not journey or not journey.get("chapters"):
+        return ()
+
+    cache = _user_cache(user)
+    if "journey_items" not in cache:
+        cache["journey_items"] = tuple(sorted(journey["chapters"].items()))
+    return cache["journey_items"]
+
+def get_chapters_by_level(user: dict) -> Dict[int, list]:
+    """Inverted index level -> [chapter_num, ...] for the active journey.
+
+    Built once per user revision (session-cached) so per-level queries
+    don't rescan every chapter.
+    """
+    journey = get_active_journey(user)
+    if not journey:
+        return {}
+
+    cache = _user_cache(user)
+    if "by_level" not in cache:
+        by_level = {}
+        for chapter_num, journey_chapter in get_journey_items(user):
+            by_level.setdefault(journey_chapter.get("required_level", 1), []).append(chapter_num)
+        cache["by_level"] = by_level
+
+    return cache["by_level"]
+
 def get_chapter_data(user: dict, chapter_num: int) -> dict:
     """Get chapter data from active journey"""
     journey = get_active_journey(user)
@@ -436,15 +868,17 @@ def start_journey(user: dict, start_date: date, journey: dict, timezone: str):
     user["intro_shown"] = False
     user["achievements"] = {}  # Clean old achievements
     
+    # Full parse + normalization happens here, not at listing time
+    journey_structure = load_journey_structure(journey, user)
+
     # Initialize avatar and world with journey's initial states
-    journey_structure = journey["journey_structure"]
     initial_avatar = parse_initial_state(journey_structure.get("initial_avatar", "{}"))
     initial_world = parse_initial_state(journey_structure.get("initial_world", "{}"))
-    
+
     user["avatar"] = initial_avatar
     user["world"] = initial_world
-    
-    set_user_journey(user, journey)
+
+    set_user_journey(user, journey_structure)
     set_view("intro")
 
 def is_journey_completed(user: dict) -> bool:
@@ -452,23 +886,16 @@ def is_journey_completed(user: dict) -> bool:
     journey = get_active_journey(user)
     if not journey or not journey.get("chapters"):
         return False
-    
-    chapters_data = user.get("chapters", {})
-    
-    # Find the maximum required level in the journey
-    max_level = max(
-        chapter_data.get("required_level", 1) 
-        for chapter_data in journey["chapters"].values()
-    )
-    
-    # Check if any chapter of the maximum level is validated
-    for chapter_num, chapter_data in journey["chapters"].items():
-        if chapter_data.get("required_level", 1) == max_level:
-            chapter_record = chapters_data.get(str(chapter_num), {})
-            if chapter_record.get("validated", False):
-                return True
-    
-    return False
+
+    # Maximum required level in the journey (keys of the level index)
+    cache = _user_cache(user)
+    if "max_level" not in cache:
+        cache["max_level"] = max(get_chapters_by_level(user))
+    max_level = cache["max_level"]
+
+    # Vectorized: any validated record at the journey's maximum level
+    arrays = _user_arrays(user)
+    return bool((arrays["validated"] & arrays["in_journey"] & (arrays["level"] == max_level)).any())
 
 def get_validation_credits(user: dict) -> int:
     """Calculate how many chapters can be validated based on elapsed days"""
@@ -481,14 +908,10 @@ def get_validation_credits(user: dict) -> int:
     
     start_date = date.fromisoformat(user["start_date"])
     days_elapsed = (today(user) - start_date).days  # Pass user for timezone
-    
-    # Count already validated chapters
-    chapters_data = user.get("chapters", {})
-    validated_count = sum(
-        1 for chapter_data in chapters_data.values() 
-        if chapter_data.get("validated", False)
-    )
-    
+
+    # Count already validated chapters (vectorized reduction)
+    validated_count = int(_user_arrays(user)["validated"].sum())
+
     # Credits = days elapsed - validated chapters
     credits = days_elapsed - validated_count
     return max(0, credits)
@@ -536,66 +959,64 @@ def update_challenge_completion(user: dict, chapter_num: int, challenge_idx: int
     chapter_record = get_chapter_record(user, chapter_num)
     if 0 <= challenge_idx < len(chapter_record["challenges"]):
         chapter_record["challenges"][challenge_idx]["completed"] = completed
+        # Keep the precomputed tag in sync for commitment queries
+        chapter_record["any_completed"] = any(
+            ch.get("completed", False) for ch in chapter_record["challenges"]
+        )
         user["chapters"][str(chapter_num)] = chapter_record
         update_user(user)
 
-def can_validate_chapter(user: dict, chapter_num: int) -> bool:
+def can_validate_chapter(user: dict, chapter_num: int, ctx: Optional[AccessCtx] = None) -> bool:
     """Check if chapter can be validated - uses centralized accessibility + validation rules"""
-    # Basic accessibility check
-    access = is_chapter_accessible(user, chapter_num)
-    if not access["accessible"]:
+    if ctx is None:
+        ctx = build_access_ctx(user)
+
+    # Basic accessibility check (dict needed below for committed_chapter)
+    access = ctx.accessibility.get(chapter_num)
+    if access is None or not access["accessible"]:
         return False
-    
+
     # Additional validation-specific checks
     chapter_record = get_chapter_record(user, chapter_num)
     if chapter_record.get("validated", False):
         return False
-    
+
     if get_validation_credits(user) == 0:
         return False
-    
-    # Check commitment
-    journey = get_active_journey(user)
-    required_level = journey["chapters"][chapter_num].get("required_level", 1)
-    committed_chapter = get_committed_chapter_for_level(user, required_level)
-    if committed_chapter != chapter_num:
+
+    # Check commitment: only the committed chapter at its level validates
+    if access.get("committed_chapter") != chapter_num:
         return False
-    
+
     return True
 
 def get_validated_chapter_for_level(user: dict, required_level: int) -> Optional[int]:
     """Get the validated chapter for a given level (max 1 per level)"""
     chapters_data = user.get("chapters", {})
-    journey = get_active_journey(user)
-    
-    if not journey:
-        return None
-    
-    for chapter_num, journey_chapter in journey["chapters"].items():
-        if journey_chapter.get("required_level", 1) == required_level:
-            chapter_record = chapters_data.get(str(chapter_num), {})
-            if chapter_record.get("validated", False):
-                return chapter_num
-    
+
+    for chapter_num in get_chapters_by_level(user).get(required_level, ()):
+        chapter_record = chapters_data.get(str(chapter_num), {})
+        if chapter_record.get("validated", False):
+            return chapter_num
+
     return None
 
+def _has_completed_challenge(chapter_record: dict) -> bool:
+    """Check the precomputed any_completed tag, scanning only legacy records"""
+    any_completed = chapter_record.get("any_completed")
+    if any_completed is None:
+        any_completed = any(ch.get("completed", False) for ch in chapter_record.get("challenges", []))
+    return any_completed
+
 def get_committed_chapter_for_level(user: dict, required_level: int) -> Optional[int]:
     """Get the chapter with completed challenges for a given level (commitment)"""
     chapters_data = user.get("chapters", {})
-    journey = get_active_journey(user)
-    
-    if not journey:
-        return None
-    
-    for chapter_num, journey_chapter in journey["chapters"].items():
-        if journey_chapter.get("required_level", 1) == required_level:
-            chapter_record = chapters_data.get(str(chapter_num), {})
-            
-            # Check if any challenge is completed in this chapter
-            challenges = chapter_record.get("challenges", [])
-            if any(ch.get("completed", False) for ch in challenges):
-                return chapter_num
-    
+
+    for chapter_num in get_chapters_by_level(user).get(required_level, ()):
+        chapter_record = chapters_data.get(str(chapter_num), {})
+        if _has_completed_challenge(chapter_record):
+            return chapter_num
+
     return None
 
 def validate_chapter(user: dict, chapter_num: int):
@@ -619,10 +1040,31 @@ def reset_journey(user: dict):
     user["world"] = {}
     user["achievements"] = {}  # ← AJOUTER cette ligne
     update_user(user)
-    set_view("journey_start")
+    # Called from widget callbacks: switching the view is enough, the
+    # post-callback script run repaints without an extra rerun
+    goto("journey_start")
 
 # ---------------------------- XP Calculation ---------------------------- #
 
+# Optional numba acceleration for the XP reduction kernel; the numpy
+# fallback computes the same sum
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit:
+    @njit(cache=True, fastmath=True)
+    def _total_xp_kernel(validated, level_xp, ratio):
+        s = 0.0
+        for i in range(validated.shape[0]):
+            if validated[i]:
+                s += level_xp[i] * (1.0 + ratio[i])
+        return s
+else:
+    def _total_xp_kernel(validated, level_xp, ratio):
+        return float((level_xp * (1.0 + ratio) * validated).sum())
+
 DIFFICULTY_WEIGHTS = {
     "easy": 1.0,
     "medium": 2.0, 
@@ -637,55 +1079,68 @@ def calculate_challenge_xp(required_level: int, challenges: List[dict]) -> float
     """Calculate challenge bonus XP based on required level"""
     if not challenges:
         return 0.0
-    
-    weights = [get_challenge_weight(ch.get("difficulty", "easy")) for ch in challenges]
-    completed = [1.0 if ch["completed"] else 0.0 for ch in challenges]
-    
-    total_weight = sum(weights)
+
+    # Single fused pass with the weight lookup pre-bound: no intermediate
+    # weight/completed lists, no zip, no per-element function call
+    get_weight = DIFFICULTY_WEIGHTS.get
+    total_weight = 0.0
+    completed_weight = 0.0
+    for ch in challenges:
+        w = get_weight(ch.get("difficulty", "easy"), 1.0)
+        total_weight += w
+        if ch["completed"]:
+            completed_weight += w
+
     if total_weight == 0:
         return 0.0
-    
-    completion_ratio = sum(w * c for w, c in zip(weights, completed)) / total_weight
-    challenge_bonus = required_level * completion_ratio
-    
-    return challenge_bonus
+
+    return required_level * (completed_weight / total_weight)
 
 def calculate_total_xp(user: dict) -> float:
     """Calculate user's total XP by recalculating from challenge states"""
-    chapters_data = user.get("chapters", {})
+    cache = _user_cache(user)
+    if "total_xp" in cache:
+        return cache["total_xp"]
+
     journey = get_active_journey(user)
-    
     if not journey:
         return 0.0
-    
-    total_xp = 0.0
-    
-    for chapter_str, chapter_data in chapters_data.items():
-        if not chapter_data.get("validated", False):
-            continue
-            
-        chapter_num = int(chapter_str)
-        
-        # Get required level from journey data
-        journey_chapter = journey["chapters"].get(chapter_num, {})
-        required_level = journey_chapter.get("required_level", chapter_num)
-        
-        # Calculate XP for this chapter
-        base_xp = required_level
-        challenge_xp = calculate_challenge_xp(required_level, chapter_data.get("challenges", []))
-        chapter_total_xp = base_xp + challenge_xp
-        
-        total_xp += chapter_total_xp
-    
+
+    # Per validated chapter: base_xp + challenge bonus = level * (1 + ratio)
+    arrays = _user_arrays(user)
+    total_xp = float(_total_xp_kernel(
+        arrays["validated"], arrays["level_xp"], arrays["completion_ratio"]
+    ))
+
+    cache["total_xp"] = total_xp
     return total_xp
 
 
 # ---------------------------- Challenge Execution with RPG Context ---------------------------- #
 
-def create_challenge_namespace(user: dict, chapter_num: int) -> dict:
-    """Create rich sandbox for challenges - secure but powerful"""
-        
-    # Modules essentiels
+class _LazyModule:
+    """Proxy that imports its module on first attribute access, so heavy
+    libraries only load when a challenge actually uses them"""
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._module_name)
+        return getattr(self._module, attr)
+
+# Static part of the challenge namespace, built once per process
+_BASE_NAMESPACE = None
+
+def _get_base_namespace() -> dict:
+    """Build (once) the static part of the challenge namespace"""
+    global _BASE_NAMESPACE
+    if _BASE_NAMESPACE is not None:
+        return _BASE_NAMESPACE
+
+    # Modules essentiels (cheap - imported eagerly)
     import math
     import random
     import datetime
@@ -695,110 +1150,103 @@ def create_challenge_namespace(user: dict, chapter_num: int) -> dict:
     import re
     import statistics
     import collections
-    
-    # Data science & visualization stack
-    import numpy
-    import pandas
-    import matplotlib.pyplot
-    import seaborn
-    import plotly.express
-    import plotly.graph_objects
-    import altair
-    import sympy
     import io
-    
-    # Optionals avec fallback
-    try:
-        import graphviz
-        graphviz_available = graphviz
-    except ImportError:
-        graphviz_available = None
-        
-    try:
-        from PIL import Image
-        pil_available = Image
-    except ImportError:
-        pil_available = None
-    
-    def new_achievement(achievement_id: str, title: str = None, description: str = None):
-        """Helper function to unlock achievements from challenges"""
-        if unlock_achievement(user, achievement_id, title, description):
-            display_title = title or achievement_id
-            st.success(f"🏆 Achievement unlocked: {display_title}")
-            if description:
-                st.info(description)
-    
-    # Inject calculated XP/level into avatar (read-only info)
-    xp_info = get_xp_progress(user)
-    avatar=user['avatar']
-    avatar["xp"] = xp_info["total_xp"]
-    avatar["level"] = xp_info["current_level"]
-    
+
+    from core.editor import editor, info_bar, menu_bar, button
+
+    namespace = {
+        "st": st,
+
+        # Code editor widget (for convenience)
+        "editor": editor, "info_bar":info_bar, "menu_bar":menu_bar,"button":button,
+
+        # Standard library modules
+        "math": math, "random": random, "datetime": datetime,
+        "time": time, "json": json, "base64": base64, "re": re,
+        "statistics": statistics, "collections": collections,
+
+        # Data science & visualization - lazy, loaded on first use
+        "numpy": _LazyModule("numpy"), "pandas": _LazyModule("pandas"),
+        "pyplot": _LazyModule("matplotlib.pyplot"), "seaborn": _LazyModule("seaborn"),
+        "plotly": _LazyModule("plotly.express"), "plotly_go": _LazyModule("plotly.graph_objects"),
+        "altair": _LazyModule("altair"), "sympy": _LazyModule("sympy"),
+    }
+
     # Essential built-ins for comfortable coding
-    essential_builtins = {
+    namespace.update({
         # Core types
         'dict': dict, 'list': list, 'tuple': tuple, 'set': set,
         'str': str, 'int': int, 'float': float, 'bool': bool,
-        
+
         # Utilities
         'range': range, 'len': len, 'type': type, 'isinstance': isinstance,
         'min': min, 'max': max, 'sum': sum, 'abs': abs, 'round': round,
         'all': all, 'any': any,
-        
+
         # Iteration
         'enumerate': enumerate, 'zip': zip, 'map': map, 'filter': filter,
         'sorted': sorted, 'reversed': reversed,
-        
+
         # Inspection/debug
         'hasattr': hasattr, 'getattr': getattr, 'repr': repr,
-        
+
         # Common exceptions
         'ValueError': ValueError, 'TypeError': TypeError, 'KeyError': KeyError,
         'IndexError': IndexError, 'AttributeError': AttributeError,
 
         #File-like
-        'BytesIO':io.BytesIO, "StringIO":io.StringIO,
+        'BytesIO':io.BytesIO, "StringIO":io.StringIO
+    })
 
-        #Dynamic execution (safe in a controlled namespace)
-        'exec':exec, 'compile':compile, 'eval':eval
-    }
-    
-    from core.editor import editor, info_bar, menu_bar, button
+    # Optionals - only exposed when installed, still imported lazily
+    if importlib.util.find_spec("graphviz"):
+        namespace["graphviz"] = _LazyModule("graphviz")
 
-    namespace = {
+    if importlib.util.find_spec("PIL"):
+        namespace["PIL_Image"] = _LazyModule("PIL.Image")
+
+    _BASE_NAMESPACE = namespace
+    return _BASE_NAMESPACE
+
+@functools.lru_cache(maxsize=256)
+def compile_challenge_code(source: str):
+    """Compile challenge source once per unique text.
+
+    Challenge code re-executes on every widget interaction; caching the
+    code object turns one parse per rerun into one parse per session.
+    The filename carries a short content hash so tracebacks identify
+    which challenge source raised.
+    """
+    digest = hashlib.sha256(source.encode()).hexdigest()[:16]
+    return compile(source, f"<challenge {digest}>", "exec")
+
+def create_challenge_namespace(user: dict, chapter_num: int) -> dict:
+    """Create rich sandbox for challenges - secure but powerful"""
+
+    def new_achievement(achievement_id: str, title: str = None, description: str = None):
+        """Helper function to unlock achievements from challenges"""
+        if unlock_achievement(user, achievement_id, title, description):
+            display_title = title or achievement_id
+            st.success(f"🏆 Achievement unlocked: {display_title}")
+            if description:
+                st.info(description)
+
+    # Inject calculated XP/level into avatar (read-only info)
+    xp_info = get_xp_progress(user)
+    avatar=user['avatar']
+    avatar["xp"] = xp_info["total_xp"]
+    avatar["level"] = xp_info["current_level"]
+
+    namespace = dict(_get_base_namespace())
+    namespace.update({
         # Core RPG context (secure - no user object!)
-        "st": st,
         "avatar": avatar,           # Contains XP/level for display
         "world": user["world"],     # Story state
         "chapter_num": chapter_num,
         "new_achievement": new_achievement,
         "validate": None,  # Set by calling component
+    })
 
-        # Code editor widget (for convenience)
-        "editor": editor, "info_bar":info_bar, "menu_bar":menu_bar,"button":button,
-        
-        # Standard library modules
-        "math": math, "random": random, "datetime": datetime, 
-        "time": time, "json": json, "base64": base64, "re": re,
-        "statistics": statistics, "collections": collections,
-        
-        # Data science & visualization
-        "numpy": numpy, "pandas": pandas,
-        "pyplot": matplotlib.pyplot, "seaborn": seaborn,
-        "plotly": plotly.express, "plotly_go": plotly.graph_objects,
-        "altair": altair, "sympy": sympy,
-    }
-    
-    # Add essential built-ins
-    namespace.update(essential_builtins)
-    
-    # Add optional modules if available
-    if graphviz_available:
-        namespace["graphviz"] = graphviz_available
-    
-    if pil_available:
-        namespace["PIL_Image"] = pil_available
-    
     return namespace
 
 # ---------------------------- Journey Editor ---------------------------- #
@@ -838,41 +1286,80 @@ def create_empty_journey(name: str, chapters_count: int) -> dict:
         "chapters": chapters
     }
 
+@functools.lru_cache(maxsize=256)
+def _clean_key(filename: str) -> str:
+    """Storage key for a journey filename; memoized since edit sessions
+    resave under the same name many times"""
+    return filename.removesuffix('.json').replace(' ', '_').lower()
+
+def _journey_digest(journey: dict) -> str:
+    """Content hash used to skip saves of unchanged journeys"""
+    if orjson is not None:
+        payload = orjson.dumps(journey, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(journey, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+# Latest ISO timestamp at second granularity; save metadata doesn't need
+# microseconds and autosave paths can stamp many times per second
+_TS_CACHE = [0, ""]
+
+def _now_iso() -> str:
+    s = int(time.time())
+    if s != _TS_CACHE[0]:
+        _TS_CACHE[0] = s
+        _TS_CACHE[1] = datetime.fromtimestamp(s).isoformat()
+    return _TS_CACHE[1]
+
 def save_journey(journey: dict, filename: str, user: dict) -> bool:
     """Save journey to user's personal collection (always)"""
     try:
         # Initialize custom journeys if needed
         if "custom_journeys" not in user:
             user["custom_journeys"] = {}
-        
-        # Add/update metadata
-        journey_data = {
-            **journey,
-            "created_at": journey.get("created_at", datetime.now().isoformat()),
-            "modified_at": datetime.now().isoformat()
-        }
-        
-        # Clean filename for key
-        clean_name = filename.replace('.json', '').replace(' ', '_').lower()
-        
-        user["custom_journeys"][clean_name] = journey_data
+
+        clean_name = _clean_key(filename)
+
+        # Short-circuit resaves of identical content - no DB write needed
+        digest = _journey_digest(journey)
+        digests = st.session_state.setdefault("_journey_save_digests", {})
+        if digests.get(clean_name) == digest:
+            return True
+
+        # Stamp metadata in place - no shallow copy of the whole document
+        # per save; update_user snapshots at write time anyway
+        journey.setdefault("created_at", _now_iso())
+        journey["modified_at"] = _now_iso()
+
+        user["custom_journeys"][clean_name] = journey
+        digests[clean_name] = digest
         update_user(user)
         return True
-        
+
     except Exception as e:
         print(f"Error saving journey: {e}")
         return False
 
+# Set once the journeys/ directory is known to exist - saves a stat per save
+_JOURNEYS_DIR_READY = False
+
+# Digest of the payload last written per file path - identical resaves skip
+# the disk write entirely
+_FILE_SAVE_DIGESTS: Dict[str, str] = {}
+
 def save_journey_to_file(journey: dict, filename: str = None) -> bool:
     """Save journey to journeys/ directory"""
+    global _JOURNEYS_DIR_READY
     try:
         if not filename:
             filename = f"{journey['title'].lower().replace(' ', '_')}.json"
-        
+
         if not filename.endswith('.json'):
             filename += '.json'
-        
-        os.makedirs("journeys", exist_ok=True)
+
+        if not _JOURNEYS_DIR_READY:
+            os.makedirs("journeys", exist_ok=True)
+            _JOURNEYS_DIR_READY = True
         filepath = f"journeys/{filename}"
         
         save_data = {
@@ -884,17 +1371,47 @@ def save_journey_to_file(journey: dict, filename: str = None) -> bool:
             "success_text": journey["success_text"],
             "initial_avatar":journey["initial_avatar"],
             "initial_world":journey["initial_world"],
-            "chapters": {str(k): v for k, v in journey["chapters"].items()}
+            # Both encoders stringify the int chapter keys themselves
+            "chapters": journey["chapters"]
         }
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, indent=2, ensure_ascii=False)
-        
+
+        # Encode fully before touching the disk (orjson emits bytes in one
+        # shot; json.dump would stream one write per token)
+        if orjson is not None:
+            payload = orjson.dumps(save_data,
+                                   option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(save_data, indent=2, ensure_ascii=False).encode('utf-8')
+
+        # Skip the write when the payload matches what we last wrote here -
+        # hashing a few hundred KB is sub-millisecond vs the disk round-trip
+        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        if _FILE_SAVE_DIGESTS.get(filepath) == digest:
+            return True
+        _FILE_SAVE_DIGESTS[filepath] = digest
+
+        # Write to a sibling temp file and swap it in atomically, so an
+        # interrupted save never leaves a half-written journey behind
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, filepath)
+
         return True
     except Exception as e:
         print(f"Error saving journey: {e}")
         return False
 
+@st.cache_data(show_spinner=False, ttl=24*60*60)
+def _load_normalized_journey(filepath: str, mtime_ns: int) -> dict:
+    """Parse and normalize an official journey once per on-disk version.
+
+    Keyed on mtime so edits to the file invalidate naturally;
+    st.cache_data hands each caller a fresh copy that is safe to edit.
+    """
+    with open(filepath, 'rb') as f:
+        return normalize_journey_structure(_json_loads(f.read()))
+
 def load_journey_for_editing(journey_name: str, user: dict, source: str = "official") -> dict:
     """Load journey for editing - official journeys get cloned to personal"""
     try:
@@ -913,11 +1430,8 @@ def load_journey_for_editing(journey_name: str, user: dict, source: str = "offic
             if not filepath.endswith('.json'):
                 filepath += '.json'
                 
-            with open(filepath, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
-            
-            journey = normalize_journey_structure(raw_data)
-            
+            journey = _load_normalized_journey(filepath, os.stat(filepath).st_mtime_ns)
+
             # Mark as modified official journey ← NOUVEAU
             journey["title"] = f"{journey['title']} (My Version)"  # Clear indication
             
@@ -927,45 +1441,125 @@ def load_journey_for_editing(journey_name: str, user: dict, source: str = "offic
         print(f"Error loading journey: {e}")
         return None
 
-def validate_journey_structure(journey: dict) -> list[str]:
-    """Validate journey structure and return list of errors"""
+# Constants shared by the schema and the Python walk
+_REQUIRED_JOURNEY_FIELDS = ("title", "description", "image", "intro_text",
+                            "failure_text", "success_text", "chapters")
+_DIFFICULTIES = frozenset(DIFFICULTY_WEIGHTS)
+
+# Schema mirror of validate_journey_structure's checks, compiled once to
+# straight-line code when fastjsonschema is installed. Deliberately no looser
+# than the Python walk: schema-valid implies the walk finds no errors, so the
+# fast path can only short-circuit the common "journey is fine" case - every
+# invalid journey still goes through the walk for its readable error list.
+JOURNEY_SCHEMA = {
+    "type": "object",
+    "required": list(_REQUIRED_JOURNEY_FIELDS),
+    "properties": {
+        "title": {"type": "string", "minLength": 1},
+        "chapters": {
+            "type": "object",
+            "minProperties": 1,
+            "additionalProperties": {
+                "type": "object",
+                "required": ["intro", "challenges"],
+                "properties": {
+                    "intro": {"type": "string", "minLength": 1},
+                    "challenges": {
+                        "type": "array",
+                        "minItems": 1,
+                        "items": {
+                            "type": "object",
+                            "required": ["title", "difficulty"],
+                            "properties": {
+                                "title": {"type": "string", "minLength": 1},
+                                "difficulty": {"enum": sorted(_DIFFICULTIES)}
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+try:
+    import fastjsonschema
+    _check_journey_schema = fastjsonschema.compile(JOURNEY_SCHEMA)
+except ImportError:
+    _check_journey_schema = None
+
+class _ValidationStop(Exception):
+    """Raised internally to abort a fail-fast validation on the first error"""
+
+def validate_journey_structure(journey: dict, fail_fast: bool = False) -> list[str]:
+    """Validate journey structure and return list of errors.
+
+    With fail_fast=True the walk stops at the first problem and returns a
+    single-element list - callers that only need a yes/no answer skip the
+    full deep scan on malformed input.
+    """
+    if _check_journey_schema is not None:
+        try:
+            _check_journey_schema(journey)
+            return []  # Compiled fast path: journey is valid
+        except Exception:
+            pass  # Fall through to the walk for the detailed error list
+
     errors = []
-    
+    if fail_fast:
+        def append(msg):
+            raise _ValidationStop(msg)
+    else:
+        append = errors.append
+
+    try:
+        return _walk_journey_errors(journey, errors, append)
+    except _ValidationStop as stop:
+        return [str(stop)]
+
+def _walk_journey_errors(journey: dict, errors: list, append) -> list[str]:
+
     # General structure
-    required_fields = ["title", "description", "image", "intro_text", "failure_text", "success_text", "chapters"]
-    for field in required_fields:
+    for field in _REQUIRED_JOURNEY_FIELDS:
         if field not in journey:
-            errors.append(f"Missing field: {field}")
-    
+            append(f"Missing field: {field}")
+
     if not journey.get("title"):
-        errors.append("Journey title is required")
-    
+        append("Journey title is required")
+
     if not journey.get("chapters"):
-        errors.append("Journey must contain at least one chapter")
-    
-    # Validate chapters
+        append("Journey must contain at least one chapter")
+
+    # Validate chapters (pre-bound accessors, same pattern as normalization).
+    # EAFP throughout: JSON-decoded non-dicts have no .get, so the
+    # AttributeError replaces an isinstance check the valid path never needs.
     for chapter_num, chapter_data in journey.get("chapters", {}).items():
-        if not isinstance(chapter_data, dict):
-            errors.append(f"Chapter {chapter_num}: invalid structure")
+        try:
+            get = chapter_data.get
+        except AttributeError:
+            append(f"Chapter {chapter_num}: invalid structure")
             continue
-            
-        if not chapter_data.get("intro"):
-            errors.append(f"Chapter {chapter_num}: missing introduction")
-        
-        challenges = chapter_data.get("challenges", [])
+
+        if not get("intro"):
+            append(f"Chapter {chapter_num}: missing introduction")
+
+        challenges = get("challenges", [])
         if not challenges:
-            errors.append(f"Chapter {chapter_num}: no challenges defined")
-        
+            append(f"Chapter {chapter_num}: no challenges defined")
+
         for i, challenge in enumerate(challenges):
-            if not isinstance(challenge, dict):
-                errors.append(f"Chapter {chapter_num}, Challenge {i+1}: invalid structure")
+            prefix = f"Chapter {chapter_num}, Challenge {i+1}:"
+            try:
+                title = challenge.get("title")
+            except AttributeError:
+                append(f"{prefix} invalid structure")
                 continue
-                
-            if not challenge.get("title"):
-                errors.append(f"Chapter {chapter_num}, Challenge {i+1}: missing title")
-            
+
+            if not title:
+                append(f"{prefix} missing title")
+
             difficulty = challenge.get("difficulty")
-            if difficulty not in ["easy", "medium", "hard", "extreme"]:
-                errors.append(f"Chapter {chapter_num}, Challenge {i+1}: invalid difficulty ({difficulty})")
-    
+            if difficulty not in _DIFFICULTIES:
+                append(f"{prefix} invalid difficulty ({difficulty})")
+
     return errors
\ No newline at end of file
@@ -0,0 +1,26 @@
+# cache.py
+# Session-scoped memoization helpers
+
+import functools
+import streamlit as st
+
+def session_memo(fn):
+    """Memoize a function's results in st.session_state.
+
+    Unlike st.cache_data, which is process-wide and shared across users,
+    results memoized here survive reruns within one session but never leak
+    to other sessions. Arguments must be hashable - pass lightweight tokens
+    (username, state version, UserRef) rather than whole documents.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+        cache = st.session_state.setdefault("_session_memo", {})
+        if key not in cache:
+            cache[key] = fn(*args, **kwargs)
+        return cache[key]
+    return wrapper
+
+def clear_session_memo():
+    """Drop all session-memoized results for the current session"""
+    st.session_state.pop("_session_memo", None)
@@ -2,12 +2,14 @@
 # UI Components for RPG-style streak challenge app
 
 import streamlit as st
+import functools
+import re
 import time
 import json
+from collections import defaultdict
 from datetime import date
 from typing import Optional
-from core.editor import editor
-from core.utils import bytesio_to_base64, base64_to_bytesio
+from core.utils import bytesio_to_base64, base64_to_bytes
 
 from core.business import (
     get_user, create_user, verify_password, 
@@ -18,20 +20,37 @@ from core.business import (
     get_xp_progress, is_journey_completed, create_empty_journey, save_journey, 
     load_journey_for_editing, validate_journey_structure,
     get_challenge_weight, mark_intro_shown, create_challenge_namespace, update_user,
-    can_validate_chapter, get_validation_credits, get_committed_chapter_for_level, 
+    can_validate_chapter, get_validation_credits, get_committed_chapter_for_level,
     get_validated_chapter_for_level, has_achievements,
-    is_chapter_accessible, is_challenge_accessible
+    is_chapter_accessible, is_challenge_accessible, chapter_accessible_bool,
+    build_access_ctx, check_rerun, goto,
+    batched_updates, get_journey_items, compile_challenge_code,
+    _journey_digest, _json_loads
 )
 
+# Comma-separated dependency lists ("id1, id2") - one precompiled split
+# fuses the per-element strip the old split/strip list comp did.
+# Normalized to sorted, deduplicated order on write: dependency order has no
+# meaning (it's a requirement set), and a canonical order keeps the
+# save-dedup digests stable when the user only reorders entries.
+_DEP_SPLIT = re.compile(r"\s*,\s*")
+
+def _parse_depends_on(s: str) -> list:
+    s = s.strip()
+    return sorted({d for d in _DEP_SPLIT.split(s) if d}) if s else []
+
 # ---------------------------- Auth Components ---------------------------- #
 
+@st.cache_data(show_spinner=False, max_entries=128)
+def _decode_b64(src: str) -> bytes:
+    """Decode a data-URL image once; reruns reuse the cached bytes"""
+    return base64_to_bytes(src)
+
 def show_image(src):
-    import io
-    if isinstance(src,io.BytesIO):
-        pass
-    elif isinstance(src,str):
-        if src.startswith('data:'):
-            src=base64_to_bytesio(src)
+    # Single check on the hot path: URLs and BytesIO pass straight through,
+    # only data-URLs need the (cached) decode
+    if isinstance(src, str) and src[:5] == 'data:':
+        src = _decode_b64(src)
     st.image(src,use_container_width=True)
 
 def _render_title():
@@ -78,7 +97,7 @@ def _handle_auth_submission(username, password, god_mode):
         st.session_state.user = user
         set_view("journey_start")
     else:
-        if verify_password(password, user["salt"], user["pw_hash"]):
+        if verify_password(password, user["salt"], user["pw_hash"], user.get("kdf", "sha256")):
             st.success(f"Logged in as {username}")
             if god_mode:
                 st.info("🔧 God Mode enabled - you can validate all chapters!")
@@ -90,8 +109,8 @@ def _handle_auth_submission(username, password, god_mode):
         else:
             st.error("Incorrect password")
 
-def render_auth():
-    """Authentication page"""
+def render_auth(user: Optional[dict] = None):
+    """Authentication page (user is ignored - present for uniform dispatch)"""
 
     _render_title()
 
@@ -118,10 +137,12 @@ def _render_user_info(user):
     if st.session_state.get("god_mode", False):
         st.warning("🔧 God Mode ON")
     
-    if st.button("Logout", key="logout"):
+    def on_logout():
         st.session_state.user = None
         st.session_state.god_mode = False
-        set_view("auth")
+        goto("auth")
+
+    st.button("Logout", key="logout", on_click=on_logout)
 
 def _render_user_stats(user):
     """Render user statistics with XP/level progression"""
@@ -155,8 +176,8 @@ def _render_journey_controls(user):
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("📝 Journey Editor", key="editor_button", use_container_width=True):
-            set_view("editor")
+        st.button("📝 Journey Editor", key="editor_button", use_container_width=True,
+                  on_click=goto, args=("editor",))
     
     with col2:
         if user.get("start_date"):
@@ -166,16 +187,22 @@ def _render_journey_controls(user):
     
     if st.session_state.get("confirm_give_up", False):
         st.warning("⚠️ This will reset all your progress!")
-        
+
+        def on_confirm():
+            reset_journey(user)
+            st.session_state.confirm_give_up = False
+
+        def on_cancel():
+            st.session_state.confirm_give_up = False
+
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("✅ Yes, give up", key="confirm_yes", use_container_width=True):
-                reset_journey(user)
-                del st.session_state.confirm_give_up
-        
+            st.button("✅ Yes, give up", key="confirm_yes", use_container_width=True,
+                      on_click=on_confirm)
+
         with col2:
-            if st.button("❌ Cancel", key="confirm_no", use_container_width=True):
-                del st.session_state.confirm_give_up
+            st.button("❌ Cancel", key="confirm_no", use_container_width=True,
+                      on_click=on_cancel)
 
 def render_sidebar(user: dict):
     """Render sidebar with user info and status"""
@@ -187,6 +214,17 @@ def render_sidebar(user: dict):
         _render_user_stats(user)
         _render_journey_controls(user)
 
+@st.fragment
+def sidebar_fragment(user: dict):
+    """Sidebar in its own fragment: view-scoped reruns skip it entirely,
+    and sidebar button clicks redraw only the sidebar"""
+    st.session_state._in_fragment = True
+    try:
+        render_sidebar(user)
+        check_rerun()
+    finally:
+        st.session_state._in_fragment = False
+
 # ---------------------------- Journey Start Components ---------------------------- #
 
 def _render_journey_selection():
@@ -208,41 +246,55 @@ def _render_journey_selection():
         st.info("No journeys available")
         return None
     
+    # Server-side search above ~50 entries: selectbox ships its whole
+    # option list to the frontend, which stalls on large catalogs
+    names = list(journey_options.keys())
+    if len(names) > 50:
+        query = st.text_input("Search journeys", key="journey_search")
+        if query:
+            q = query.lower()
+            names = [n for n in names if q in n.lower()][:20]
+        else:
+            names = names[:20]
+            st.caption("Showing the first 20 journeys - type above to search")
+        if not names:
+            st.info("No journey matches your search")
+            return None
+
     # Sélecteur unique
     selected_journey_name = st.selectbox(
         "Choose your journey",
-        options=list(journey_options.keys()),
+        options=names,
         key="journey_selection"
     )
     
     selected_journey = journey_options[selected_journey_name]
-    journey_structure = selected_journey["journey_structure"]
-    
-    # Affichage des infos
+
+    # Affichage des infos (header fields only - full structure loads on start)
     source_emoji = "📚" if selected_journey["source"] == "official" else "🎨"
-    st.info(f"{source_emoji} **{journey_structure.get('title', selected_journey['name'])}** - {selected_journey['chapter_count']} chapters")
-    
-    if journey_structure.get("description"):
-        st.markdown(f"*{journey_structure['description']}*")
-    
+    st.info(f"{source_emoji} **{selected_journey.get('title') or selected_journey['name']}** - {selected_journey['chapter_count']} chapters")
+
+    if selected_journey.get("description"):
+        st.markdown(f"*{selected_journey['description']}*")
+
     return selected_journey
 
+_TIMEZONE_OPTIONS = [
+    "UTC",
+    "Europe/Paris", "Europe/London", "Europe/Berlin", "Europe/Rome",
+    "America/New_York", "America/Chicago", "America/Denver", "America/Los_Angeles",
+    "Asia/Tokyo", "Asia/Shanghai", "Asia/Seoul", "Asia/Kolkata", "Asia/Dubai",
+    "Australia/Sydney", "Australia/Melbourne",
+    "Africa/Cairo", "Africa/Johannesburg",
+    "Pacific/Auckland", "Pacific/Honolulu"
+]
+
 def _render_timezone_selection():
     """Render timezone selection interface"""
-    timezone_options = [
-        "UTC",
-        "Europe/Paris", "Europe/London", "Europe/Berlin", "Europe/Rome",
-        "America/New_York", "America/Chicago", "America/Denver", "America/Los_Angeles",
-        "Asia/Tokyo", "Asia/Shanghai", "Asia/Seoul", "Asia/Kolkata", "Asia/Dubai",
-        "Australia/Sydney", "Australia/Melbourne",
-        "Africa/Cairo", "Africa/Johannesburg",
-        "Pacific/Auckland", "Pacific/Honolulu"
-    ]
-    
     return st.selectbox(
         "Your timezone",
-        options=timezone_options,
-        index=timezone_options.index("Europe/Paris"),  # Default to Paris
+        options=_TIMEZONE_OPTIONS,
+        index=_TIMEZONE_OPTIONS.index("Europe/Paris"),  # Default to Paris
         key="user_timezone",
         help="This will be used for all time-related calculations during your journey"
     )
@@ -296,26 +348,28 @@ def render_intro(user: dict):
     else:
         st.markdown("**Ready to start this adventure?**")
     
+    def on_continue():
+        mark_intro_shown(user)
+        goto("chapter")
+
     _,c,_ = st.columns(3)
     with c:
-        if st.button("Go to chapters!", use_container_width=True, type="primary"):
-            mark_intro_shown(user)
-            set_view("chapter")
+        st.button("Go to chapters!", use_container_width=True, type="primary",
+                  on_click=on_continue)
 
 
 # ---------------------------- Chapter View Components ---------------------------- #
 
 def _determine_chapter_to_show(user):
     """Determine which chapter should be displayed"""
-    if "selected_chapter" in st.session_state:
-        selected = st.session_state.selected_chapter
-        access = is_chapter_accessible(user, selected)
-        
-        if access["accessible"]:
+    # None-sentinel state: no membership test or del/KeyError branches
+    selected = st.session_state.setdefault("selected_chapter", None)
+    if selected is not None:
+        if chapter_accessible_bool(user, selected):
             return selected
-        
-        del st.session_state.selected_chapter
-    
+
+        st.session_state.selected_chapter = None
+
     set_view("chapters")
     return None
 
@@ -335,19 +389,22 @@ def render_chapters_view(user: dict):
     user_achievements = user.get("achievements", {})
     if user_achievements:
         with st.expander(f"🏆 Your Achievements ({len(user_achievements)})", expanded=False):
+            # One markdown blob instead of one st.write per achievement
+            lines = []
             for ach_data in user_achievements.values():
                 title = ach_data.get("title", "Achievement")
                 description = ach_data.get("description", "")
                 if description:
-                    st.write(f"• **{title}**: {description}")
+                    lines.append(f"• **{title}**: {description}")
                 else:
-                    st.write(f"• {title}")
+                    lines.append(f"• {title}")
+            st.markdown("  \n".join(lines))
     
     # Check for journey completion
     if is_journey_completed(user):
         st.success("🎉 Journey completed! All chapters validated.")
-        if st.button("🏆 View completion", type="primary"):
-            set_view("journey_completed")
+        st.button("🏆 View completion", type="primary",
+                  on_click=goto, args=("journey_completed",))
         return
     
     # Group chapters by level for display
@@ -356,47 +413,84 @@ def render_chapters_view(user: dict):
     chapters_data = user.get("chapters", {})
     user_level = get_xp_progress(user)["current_level"]
     
-    # Group chapters by required level
-    chapters_by_level = {}
-    for chapter_num, journey_chapter in journey["chapters"].items():
-        required_level = journey_chapter.get("required_level", 1)
-        if required_level not in chapters_by_level:
-            chapters_by_level[required_level] = []
-        chapters_by_level[required_level].append((chapter_num, journey_chapter))
-    
-    # Display each level as a section
+    # Group chapters by required level (items arrive pre-sorted by number,
+    # so each level's list is already ordered)
+    chapters_by_level = defaultdict(list)
+    for chapter_num, journey_chapter in get_journey_items(user):
+        chapters_by_level[journey_chapter.get("required_level", 1)].append((chapter_num, journey_chapter))
+
+    # One shared accessibility context for the whole grid
+    ctx = build_access_ctx(user)
+
+    # One CSS rule spaces the level sections; no st.write("") delta per level
+    st.markdown("<style>div[class*='st-key-level_'] {margin-bottom: 1rem}</style>",
+                unsafe_allow_html=True)
+
+    # Display each reachable level as a section; fully locked levels are
+    # deferred behind a toggle so a 365-chapter journey doesn't
+    # instantiate hundreds of disabled buttons per rerun
+    locked_levels = []
     for required_level in sorted(chapters_by_level.keys()):
-        level_chapters = sorted(chapters_by_level[required_level])
-        
+        level_chapters = chapters_by_level[required_level]
+
         # Level header
         validated_chapter = get_validated_chapter_for_level(user, required_level)
+        any_accessible = any(chapter_accessible_bool(user, ch_num, ctx) for ch_num, _ in level_chapters)
         if validated_chapter:
-            st.markdown(f"**📗 Level {required_level}** - ✅ Completed")
+            header = f"**📗 Level {required_level}** - ✅ Completed"
+        elif any_accessible:
+            header = f"**📘 Level {required_level}**"
         else:
-            # Check if any chapter at this level is accessible
-            any_accessible = any(is_chapter_accessible(user, ch_num)["accessible"] for ch_num, _ in level_chapters)
-            icon = "📘" if any_accessible else "📕"
-            st.markdown(f"**{icon} Level {required_level}**")
-        
-        # Display chapters in columns for this level
-        cols = st.columns(min(len(level_chapters), 6))
-        for i, (chapter_num, journey_chapter) in enumerate(level_chapters):
+            locked_levels.append(required_level)
+            continue
+
+        with st.container(key=f"level_{required_level}"):
+            st.markdown(header)
+            _render_level_chapters(user, level_chapters, chapters_data, ctx)
+
+    if locked_levels:
+        if st.toggle(f"🔒 Locked levels ({len(locked_levels)})", key="show_locked_levels"):
+            for required_level in locked_levels:
+                with st.container(key=f"level_{required_level}"):
+                    st.markdown(f"**📕 Level {required_level}**")
+                    _render_level_chapters(user, chapters_by_level[required_level], chapters_data, ctx)
+
+def _render_level_chapters(user, level_chapters, chapters_data, ctx):
+    """Render one level's chapters as a button row.
+
+    Chapters closed by a commitment elsewhere at the level can never be
+    interacted with again, so they collapse into a one-line summary
+    instead of instantiating a disabled button each.
+    """
+    closed = 0
+    to_render = []
+    for chapter_num, journey_chapter in level_chapters:
+        access = ctx.accessibility.get(chapter_num, {})
+        if access.get("reason") == "committed_elsewhere":
+            closed += 1
+        else:
+            to_render.append((chapter_num, journey_chapter))
+
+    if to_render:
+        cols = st.columns(min(len(to_render), 6))
+        for i, (chapter_num, journey_chapter) in enumerate(to_render):
             with cols[i % len(cols)]:
-                _render_chapter_button(user, chapter_num, journey_chapter, chapters_data)
-        
-        st.write("")  # Add spacing between levels
+                _render_chapter_button(user, chapter_num, journey_chapter, chapters_data, ctx)
+
+    if closed:
+        st.caption(f"🔒 {closed} other path{'s' if closed > 1 else ''} closed by your commitment")
 
-def _render_chapter_button(user: dict, chapter_num: int, journey_chapter: dict, chapters_data: dict):
+def _render_chapter_button(user: dict, chapter_num: int, journey_chapter: dict, chapters_data: dict, ctx=None):
     """Render a single chapter button - ULTRA simplified with centralized logic"""
-    
+
     # Get chapter info
     chapter_title = journey_chapter.get("title", f"Chapter {chapter_num}")
     chapter_description = journey_chapter.get("description", "")
     chapter_record = chapters_data.get(str(chapter_num), {})
     is_validated = chapter_record.get("validated", False)
-    
+
     # Use centralized accessibility check
-    access = is_chapter_accessible(user, chapter_num)
+    access = is_chapter_accessible(user, chapter_num, ctx)
     
     # Determine button appearance
     if is_validated:
@@ -431,15 +525,18 @@ def _render_chapter_button(user: dict, chapter_num: int, journey_chapter: dict,
         else:
             help_text = chapter_description or "Not accessible"
     
-    # Single button with all logic handled by centralized function
-    if st.button(button_text, 
-                key=f"chapter_btn_{chapter_num}",
-                disabled=disabled,
-                type=button_type,
-                use_container_width=True,
-                help=help_text):
+    def on_select():
         st.session_state.selected_chapter = chapter_num
-        set_view("chapter")
+        goto("chapter")
+
+    # Single button with all logic handled by centralized function
+    st.button(button_text,
+              key=f"chapter_btn_{chapter_num}",
+              disabled=disabled,
+              type=button_type,
+              use_container_width=True,
+              help=help_text,
+              on_click=on_select)
 
 def _render_commitment_warning(user, chapter_to_show):
     """Warn user about irrevocable commitment"""
@@ -449,7 +546,7 @@ def _render_commitment_warning(user, chapter_to_show):
     
     if not committed_chapter and not st.session_state.get("god_mode", False):
         chapters_at_level = [
-            num for num, ch in journey["chapters"].items() 
+            num for num, ch in get_journey_items(user)
             if ch.get("required_level", 1) == required_level
         ]
         
@@ -461,12 +558,14 @@ def _render_commitment_warning(user, chapter_to_show):
 
 def render_chapter_view(user: dict):
     """Current chapter view"""
+    def on_back():
+        st.session_state.selected_chapter = None
+        goto("chapters")
+
     _,c=st.columns([80,20])
     with c:
-        if st.button("← Back to chapters", type="tertiary", key="back_to_chapters"):
-            if "selected_chapter" in st.session_state:
-                del st.session_state.selected_chapter
-            set_view("chapters")
+        st.button("← Back to chapters", type="tertiary", key="back_to_chapters",
+                  on_click=on_back)
     
     chapter_to_show = _determine_chapter_to_show(user)
     if not chapter_to_show:
@@ -510,14 +609,22 @@ def _render_chapter_header(chapter_to_show, chapter_record, user):
 
 def _render_chapter_intro(chapter_record):
     """Render chapter introduction text"""
+    parts = []
     if chapter_record.get("title"):
-        st.header(chapter_record["title"])
+        parts.append(f"## {chapter_record['title']}")
 
     if chapter_record.get("image"):
+        # Flush buffered text before the image, then restart the buffer
+        if parts:
+            st.markdown("\n\n".join(parts))
+            parts = []
         show_image(chapter_record['image'])
-    
+
     if chapter_record.get("intro"):
-        st.markdown(chapter_record["intro"])
+        parts.append(chapter_record["intro"])
+
+    if parts:
+        st.markdown("\n\n".join(parts))
 
 def _render_challenge_item(user, chapter_to_show, challenge, challenge_idx, is_validated, is_elapsed):
     """Render a single challenge item - SIMPLIFIED with centralized accessibility"""
@@ -530,14 +637,12 @@ def _render_challenge_item(user, chapter_to_show, challenge, challenge_idx, is_v
                 st.markdown(challenge["description"])
                 
             difficulty = challenge.get("difficulty", "easy")
-            difficulty_emoji = {
-                "easy": "🟢", "medium": "🟡", 
-                "hard": "🟠", "extreme": "🔴"
-            }
-            st.caption(f"{difficulty_emoji.get(difficulty, '🟢')} {difficulty.title()}")
-            
-            # Show missing achievements if any
+            st.caption(f"{_DIFFICULTY_EMOJI.get(difficulty, '🟢')} {difficulty.title()}")
+
+            # Checked once, reused by both columns
             access = is_challenge_accessible(user, chapter_to_show, challenge_idx)
+
+            # Show missing achievements if any
             if not access["accessible"] and access["reason"] == "missing_achievements":
                 st.caption(f"🔒 Requires: {', '.join(access['missing_achievements'])}")
 
@@ -545,25 +650,26 @@ def _render_challenge_item(user, chapter_to_show, challenge, challenge_idx, is_v
             if challenge.get("completed", False):
                 st.write("✅")
             else:
-                access = is_challenge_accessible(user, chapter_to_show, challenge_idx)
                 if access["accessible"]:
-                    if st.button("🎮 Run", key=f"run_challenge_{chapter_to_show}_{challenge_idx}"):
+                    def on_run():
                         st.session_state.current_challenge = {
                             "challenge": challenge,
                             "chapter": chapter_to_show,
                             "index": challenge_idx
                         }
-                        set_view("challenge")
+                        goto("challenge")
+
+                    st.button("🎮 Run", key=f"run_challenge_{chapter_to_show}_{challenge_idx}",
+                              on_click=on_run)
                 else:
                     st.write("❌")
 
 def render_challenge_view(user: dict):
     """Render interactive challenge view with RPG context"""
-    if "current_challenge" not in st.session_state:
+    challenge_data = st.session_state.setdefault("current_challenge", None)
+    if challenge_data is None:
         set_view("chapter")
         return
-    
-    challenge_data = st.session_state.current_challenge
     challenge = challenge_data["challenge"]
     chapter_num = challenge_data["chapter"]
     
@@ -595,13 +701,19 @@ with b:
     challenge_globals["validate"] = lambda success: _validate_challenge(user, challenge_data, success)
     
     try:
-        code=compile(code,mode="exec",filename="user")
-        exec(code, challenge_globals)
-        update_user(user)
+        code = compile_challenge_code(code)
+        # Challenge code reruns on every widget interaction; persist only
+        # when it actually touched avatar/world. Achievement unlocks and
+        # validations call update_user themselves inside the batch.
+        state_before = (repr(user["avatar"]), repr(user["world"]))
+        with batched_updates(user):
+            exec(code, challenge_globals)
+            if (repr(user["avatar"]), repr(user["world"])) != state_before:
+                update_user(user)
     except Exception as e:
         st.error(f"Challenge error: {e}")
         if st.button("← Back to chapter"):
-            del st.session_state.current_challenge
+            st.session_state.current_challenge = None
             set_view("chapter")
 
 def _validate_challenge(user: dict, challenge_data: dict, success: bool):
@@ -610,13 +722,16 @@ def _validate_challenge(user: dict, challenge_data: dict, success: bool):
     challenge_idx = challenge_data["index"]
     
     update_challenge_completion(user, chapter_num, challenge_idx, success)
-    
-    with st.spinner("Processing your choice..."):
-        time.sleep(5)
-    
-    del st.session_state.current_challenge
+
+    st.toast("✅ Choice recorded", icon="🎉")
+
+    st.session_state.current_challenge = None
     set_view("chapter")
-    rerun()
+
+_DIFFICULTY_EMOJI = {
+    "easy": "🟢", "medium": "🟡",
+    "hard": "🟠", "extreme": "🔴"
+}
 
 def _render_challenges_list(user, chapter_to_show, challenges, is_validated, is_elapsed):
     """Render the list of challenges"""
@@ -636,10 +751,16 @@ def _render_xp_preview(chapter_to_show, challenges, user):
     
     journey = get_active_journey(user)
     required_level = journey["chapters"][chapter_to_show].get("required_level", chapter_to_show)
-    
+
     base = required_level
-    bonus = sum(get_challenge_weight(ch["difficulty"]) for ch in challenges if ch.get("completed", False))
-    total_weight = sum(get_challenge_weight(ch["difficulty"]) for ch in challenges)
+    # Single pass: one weight lookup per challenge instead of two
+    gw = get_challenge_weight
+    bonus = total_weight = 0.0
+    for ch in challenges:
+        w = gw(ch["difficulty"])
+        total_weight += w
+        if ch.get("completed", False):
+            bonus += w
     challenge_xp = (required_level * (bonus / total_weight)) if total_weight > 0 else 0
     
     st.divider()
@@ -652,18 +773,7 @@ def _render_validation_animation():
     """Render validation success animation"""
     st.balloons()
     st.success("🔥 Chapter validated! XP gained!")
-    
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    for i in range(3):
-        status_text.text(f"Back to chapters in {3-i} seconds...")
-        progress_bar.progress((i + 1) / 3)
-        time.sleep(1)
-    
-    status_text.text("Let's explore! 🗺️")
-    time.sleep(0.5)
-    
+
     set_view("chapters")
 
 def _render_chapter_action_buttons(user, chapter_to_show, is_validated, can_validate):
@@ -673,8 +783,7 @@ def _render_chapter_action_buttons(user, chapter_to_show, is_validated, can_vali
         
         if st.button("🎆 I completed my chapter!", type="primary", key="validate", use_container_width=True):
             validate_chapter(user, chapter_to_show)
-            _render_validation_animation()
-            rerun()
+            _render_validation_animation()  # set_view already requests the rerun
 
 # ---------------------------- Other Views ---------------------------- #
 
@@ -702,8 +811,8 @@ def render_journey_failed(user: dict):
         **Ready for a new attempt?**
         """)
     
-    if st.button("🔥 Start new adventure", type="primary"):
-        set_view("journey_start")
+    st.button("🔥 Start new adventure", type="primary",
+              on_click=goto, args=("journey_start",))
 
 def render_journey_completed(user: dict):
     """Journey completion page with custom text"""
@@ -727,8 +836,8 @@ def render_journey_completed(user: dict):
         **Ready for a new adventure?**
         """)
     
-    if st.button("🚀 New Adventure", type="primary"):
-        set_view("journey_start")
+    st.button("🚀 New Adventure", type="primary",
+              on_click=goto, args=("journey_start",))
 
 # ---------------------------- Editor Components ---------------------------- #
 
@@ -755,8 +864,8 @@ def _render_editor_header():
             )
         
         with col2:
-            if st.button("← Back", type="tertiary", key="editor_back"):
-                set_view("journey_start")
+            st.button("← Back", type="tertiary", key="editor_back",
+                      on_click=goto, args=("journey_start",))
 
     elif st.session_state.get("editing_journey"):
         mode = st.session_state.get("edition_mode", "New journey")
@@ -838,57 +947,77 @@ def _render_image_selector(target,key):
 
 
 
+@st.cache_data(show_spinner=False, max_entries=64)
+def _json_error(s: str) -> Optional[str]:
+    """Parse a JSON string once per distinct text; returns the error or None.
+
+    Uses orjson's C parser when installed (via business._json_loads);
+    orjson.JSONDecodeError subclasses json.JSONDecodeError so one except
+    clause covers both backends.
+    """
+    try:
+        _json_loads(s)
+        return None
+    except json.JSONDecodeError as e:
+        return str(e)
+
 def _render_journey_editor(journey):
     """Render the main journey editor interface"""
     
-    # Journey metadata
-    st.markdown("### General information")
-    
-    journey["title"] = st.text_input("Journey title", value=journey.get("title", ""), key="journey_title")
-    journey["description"] = st.text_area("Short description", value=journey.get("description", ""), height=68, key="journey_description")
+    # Journey metadata - batched in a form so typing doesn't rerun the app,
+    # one rerun per "Apply" instead of one per keystroke/focus change
+    with st.form("journey_meta_form"):
+        st.markdown("### General information")
+
+        journey["title"] = st.text_input("Journey title", value=journey.get("title", ""), key="journey_title")
+        journey["description"] = st.text_area("Short description", value=journey.get("description", ""), height=68, key="journey_description")
+
+        # RPG Initial States
+        with st.expander("🎮 RPG Initial States", expanded=False):
+            st.markdown("**Initial Avatar State (JSON)**")
+            avatar_json = st.text_area(
+                "Avatar state",
+                value=journey.get("initial_avatar", "{}"),
+                height=120,
+                key="journey_avatar",
+                help="JSON object defining initial avatar attributes"
+            )
 
-    _render_image_selector(journey,"journey")
+            st.markdown("**Initial World State (JSON)**")
+            world_json = st.text_area(
+                "World state",
+                value=journey.get("initial_world", "{}"),
+                height=120,
+                key="journey_world",
+                help="JSON object defining initial world state"
+            )
 
-    # RPG Initial States
-    with st.expander("🎮 RPG Initial States", expanded=False):
-        st.markdown("**Initial Avatar State (JSON)**")
-        avatar_json = st.text_area(
-            "Avatar state",
-            value=journey.get("initial_avatar", "{}"),
-            height=120,
-            key="journey_avatar",
-            help="JSON object defining initial avatar attributes"
-        )
-        
-        st.markdown("**Initial World State (JSON)**")
-        world_json = st.text_area(
-            "World state",
-            value=journey.get("initial_world", "{}"),
-            height=120,
-            key="journey_world",
-            help="JSON object defining initial world state"
-        )
-        
-        # Validate JSON
-        try:
+            # Validate JSON (parse results cached per string content)
             journey["initial_avatar"] = avatar_json
-            json.loads(avatar_json)
-            st.success("✅ Avatar JSON is valid")
-        except json.JSONDecodeError as e:
-            st.error(f"❌ Avatar JSON error: {e}")
-        
-        try:
+            avatar_err = _json_error(avatar_json)
+            if avatar_err is None:
+                st.success("✅ Avatar JSON is valid")
+            else:
+                st.error(f"❌ Avatar JSON error: {avatar_err}")
+
             journey["initial_world"] = world_json
-            json.loads(world_json)
-            st.success("✅ World JSON is valid")
-        except json.JSONDecodeError as e:
-            st.error(f"❌ World JSON error: {e}")
-    
-    # Texts
-    with st.expander("📜 Journey texts", expanded=False):
-        journey["intro_text"] = st.text_area("Introduction text", value=journey.get("intro_text", ""), height=120, key="journey_intro")
-        journey["success_text"] = st.text_area("Success text", value=journey.get("success_text", ""), height=120, key="journey_success")
-        journey["failure_text"] = st.text_area("Failure text", value=journey.get("failure_text", ""), height=120, key="journey_failure")
+            world_err = _json_error(world_json)
+            if world_err is None:
+                st.success("✅ World JSON is valid")
+            else:
+                st.error(f"❌ World JSON error: {world_err}")
+
+        # Texts
+        with st.expander("📜 Journey texts", expanded=False):
+            journey["intro_text"] = st.text_area("Introduction text", value=journey.get("intro_text", ""), height=120, key="journey_intro")
+            journey["success_text"] = st.text_area("Success text", value=journey.get("success_text", ""), height=120, key="journey_success")
+            journey["failure_text"] = st.text_area("Failure text", value=journey.get("failure_text", ""), height=120, key="journey_failure")
+
+        st.form_submit_button("Apply changes")
+
+    # Image selector stays outside the form: its toggle/uploader need
+    # immediate reruns to reveal their inputs
+    _render_image_selector(journey,"journey")
     
     # Journey stats
     chapters_count = len(journey.get("chapters", {}))
@@ -908,20 +1037,30 @@ def _render_journey_editor(journey):
                 "required_level": 1,
                 "depends_on": []
             }
-            st.rerun()
+            st.rerun(scope="app")
     else:
-        for chapter_num in sorted(chapters.keys()):
-            _render_chapter_editor(journey, chapter_num)
+        # Sort once for the whole page; each chapter editor only needs to
+        # know whether it's first/last, not re-sort the key set itself
+        chapter_numbers = sorted(chapters.keys())
+        first_key, last_key = chapter_numbers[0], chapter_numbers[-1]
+        for chapter_num in chapter_numbers:
+            _render_chapter_editor(journey, chapter_num, first_key, last_key)
 
     _render_save_controls(journey)
 
-def _render_chapter_editor(journey, chapter_num):
-    """Render editor for a single chapter with controls"""
+@st.fragment
+def _render_chapter_editor(journey, chapter_num, first_key, last_key):
+    """Render editor for a single chapter with controls.
+
+    Runs as a fragment: edits inside one chapter rerun only this subtree.
+    Structural operations that change the chapter set (delete/move/insert)
+    rerun the whole editor explicitly with scope="app". first_key/last_key
+    come pre-computed from the caller's single sort of the chapter set.
+    """
     chapter_data = journey["chapters"][chapter_num]
     chapters = journey["chapters"]
-    chapter_numbers = sorted(chapters.keys())
-    is_first = chapter_num == min(chapter_numbers)
-    is_last = chapter_num == max(chapter_numbers)
+    is_first = chapter_num == first_key
+    is_last = chapter_num == last_key
     
     with st.expander(f"Chapter {chapter_num}", expanded=chapter_num == 1):
         # Chapter controls (delete, move, etc.)
@@ -931,87 +1070,130 @@ def _render_chapter_editor(journey, chapter_num):
             disabled = len(chapters) <= 1
             if st.button("🗑️", key=f"delete_chapter_{chapter_num}", help="Delete this chapter", type="tertiary", disabled=disabled):
                 _delete_chapter(journey, chapter_num)
-                st.rerun()
-        
+                st.rerun(scope="app")
+
         with col2:
             if st.button("⬆️", key=f"moveup_chapter_{chapter_num}", help="Move up", type="tertiary", disabled=is_first):
                 _move_chapter_up(journey, chapter_num)
-                st.rerun()
-        
+                st.rerun(scope="app")
+
         with col3:
             if st.button("⬇️", key=f"movedown_chapter_{chapter_num}", help="Move down", type="tertiary", disabled=is_last):
                 _move_chapter_down(journey, chapter_num)
-                st.rerun()
-        
+                st.rerun(scope="app")
+
         with col4:
             if st.button("➕", key=f"insert_chapter_{chapter_num}", help="Insert chapter after", type="tertiary"):
                 _insert_chapter_after(journey, chapter_num)
-                st.rerun()
+                st.rerun(scope="app")
 
         # NOUVEAU : Chapter metadata (title & description)
-        st.markdown("**Chapter Information**")
-        col1, col2= st.columns(2)
-        
-        with col1:
-            chapter_title = st.text_input(
-                "Chapter Title",
-                value=chapter_data.get("title", f"Chapter {chapter_num}"),
-                key=f"chapter_title_{chapter_num}",
-                help="Short title for navigation buttons"
-            )
-            chapter_data["title"] = chapter_title
-        
-        with col2:
-            chapter_description = st.text_input(
-                "Chapter Description",
-                value=chapter_data.get("description", ""),
-                key=f"chapter_description_{chapter_num}",
-                help="Description shown in button tooltips"
-            )
-            chapter_data["description"] = chapter_description
+        # Batched in a form like the journey metadata above: text fields only
+        # push their values on "Apply changes" instead of rerunning per edit.
+        # Structural buttons (delete/move/insert) stay outside - buttons other
+        # than the submit aren't allowed inside a form anyway.
+        with st.form(f"chapter_form_{chapter_num}"):
+            st.markdown("**Chapter Information**")
+            col1, col2= st.columns(2)
+
+            with col1:
+                chapter_title = st.text_input(
+                    "Chapter Title",
+                    value=chapter_data.get("title", f"Chapter {chapter_num}"),
+                    key=f"chapter_title_{chapter_num}",
+                    help="Short title for navigation buttons"
+                )
+                chapter_data["title"] = chapter_title
+
+            with col2:
+                chapter_description = st.text_input(
+                    "Chapter Description",
+                    value=chapter_data.get("description", ""),
+                    key=f"chapter_description_{chapter_num}",
+                    help="Description shown in button tooltips"
+                )
+                chapter_data["description"] = chapter_description
+
+            # Chapter settings (niveau requis, dépendances)
+            col1, col2 = st.columns([70, 30])
+
+            with col1:
+                new_intro = st.text_area(
+                    f"Chapter {chapter_num} introduction",
+                    value=chapter_data.get("intro", ""),
+                    key=f"intro_{chapter_num}",
+                    height=125
+                )
+                chapter_data["intro"] = new_intro
+
+            with col2:
+                required_level = st.number_input(
+                    "Required level",
+                    min_value=1,
+                    max_value=200,
+                    value=chapter_data.get("required_level", 1),
+                    key=f"required_level_{chapter_num}",
+                    help="Player level required to access this chapter"
+                )
+                chapter_data["required_level"] = required_level
+
+                # Dependencies control
+                depends_on_str = st.text_input(
+                    "Depends on",
+                    value=",".join(chapter_data.get("depends_on", [])),
+                    key=f"depends_on_{chapter_num}",
+                    help="Achievement IDs required (comma-separated)"
+                )
+                chapter_data["depends_on"] = _parse_depends_on(depends_on_str)
+
+            st.form_submit_button("Apply changes")
 
-        # Chapter settings (niveau requis, dépendances)
-        col1, col2 = st.columns([70, 30])
-        
-        with col1:
-            new_intro = st.text_area(
-                f"Chapter {chapter_num} introduction",
-                value=chapter_data.get("intro", ""),
-                key=f"intro_{chapter_num}",
-                height=125
-            )
-            chapter_data["intro"] = new_intro
-        
-        with col2:
-            required_level = st.number_input(
-                "Required level",
-                min_value=1,
-                max_value=200,
-                value=chapter_data.get("required_level", 1),
-                key=f"required_level_{chapter_num}",
-                help="Player level required to access this chapter"
-            )
-            chapter_data["required_level"] = required_level
-            
-            # Dependencies control
-            depends_on_str = st.text_input(
-                "Depends on",
-                value=",".join(chapter_data.get("depends_on", [])),
-                key=f"depends_on_{chapter_num}",
-                help="Achievement IDs required (comma-separated)"
-            )
-            # Parse dependencies
-            if depends_on_str.strip():
-                chapter_data["depends_on"] = [dep.strip() for dep in depends_on_str.split(",") if dep.strip()]
-            else:
-                chapter_data["depends_on"] = []
-        
         _render_image_selector(chapter_data,key=chapter_num)
 
-        # Challenges section
-        st.markdown("**Challenges:**")
-        with st.container(border=True):
-            _render_challenges_tabs(journey, chapter_num)
+        # Challenges section - built lazily. The expander body runs on every
+        # rerun even when collapsed, so the tab/widget tree for a chapter's
+        # challenges is only constructed once its toggle is on. Keeps widget
+        # construction O(visible) instead of O(chapters x challenges).
+        n_challenges = len(chapter_data.get("challenges", []))
+        show = st.toggle(
+            f"**Challenges** ({n_challenges})",
+            key=f"show_challenges_{chapter_num}",
+            value=chapter_num == 1,
+        )
+        if show:
+            with st.container(border=True):
+                _render_challenges_tabs(journey, chapter_num)
+
+@functools.lru_cache(maxsize=256)
+def _challenge_syntax_error(source):
+    """Syntax-check challenge code once per distinct text.
+
+    compile_challenge_code only caches successful compiles (lru_cache
+    doesn't memoize exceptions), so invalid code would otherwise be
+    recompiled on every rerun while its editor is open. This caches the
+    error message too.
+    """
+    try:
+        compile_challenge_code(source)
+        return None
+    except SyntaxError as e:
+        return str(e)
+
+@functools.lru_cache(maxsize=256)
+def _challenge_tab_names(titles):
+    """Build the tab label list for a tuple of challenge titles.
+
+    Keyed on the titles themselves rather than a manual version counter:
+    titles can change through the Apply form as well as the structural
+    buttons, and content keying can't go stale.
+    """
+    names = []
+    for i, title in enumerate(titles):
+        if len(title) > 15:
+            title = title[:12] + "..."
+        names.append(f"{i+1}. {title}")
+    names.append("➕ New")
+    return names
 
 def _render_challenges_tabs(journey, chapter_num):
     """Render challenges using tabs interface"""
@@ -1027,19 +1209,52 @@ def _render_challenges_tabs(journey, chapter_num):
                 "completed": False,
                 "depends_on": []
             })
-            st.rerun()
+            # Tabs live inside the chapter fragment: no need to rerun the page
+            st.rerun(scope="fragment")
         return
     
-    # Create tabs for challenges
-    tab_names = []
-    for i, challenge in enumerate(challenges):
-        title = challenge.get("title", f"Challenge {i+1}")
-        if len(title) > 15:
-            title = title[:12] + "..."
-        tab_names.append(f"{i+1}. {title}")
-    
-    tab_names.append("➕ New")
-    
+    # Challenge metadata is edited in a single table: one data_editor
+    # replaces four widgets per challenge, which is where most of the
+    # editor's widget count went. Imported lazily like the code editor.
+    import pandas as pd
+
+    df = pd.DataFrame([{
+        "title": challenge.get("title", ""),
+        "difficulty": challenge.get("difficulty", "easy"),
+        "depends_on": ",".join(challenge.get("depends_on", [])),
+        "description": challenge.get("description", ""),
+    } for challenge in challenges])
+    edited = st.data_editor(
+        df,
+        use_container_width=True,
+        num_rows="fixed",
+        key=f"challenges_table_{chapter_num}",
+        column_config={
+            "title": st.column_config.TextColumn("Title", required=True),
+            "difficulty": st.column_config.SelectboxColumn(
+                "Difficulty", options=["easy", "medium", "hard", "extreme"]
+            ),
+            "depends_on": st.column_config.TextColumn(
+                "Depends on", help="Achievement IDs required (comma-separated)"
+            ),
+            "description": st.column_config.TextColumn("Description"),
+        },
+    )
+    # Write the table back by index; rows are fixed so the mapping to the
+    # underlying challenge dicts (which also carry code/image) is stable
+    for challenge, row in zip(challenges, edited.to_dict("records")):
+        challenge["title"] = row["title"]
+        challenge["difficulty"] = row["difficulty"]
+        challenge["description"] = row["description"]
+        challenge["depends_on"] = _parse_depends_on(row["depends_on"] or "")
+
+    # Tabs keep the per-challenge bits a table can't hold: image, code and
+    # the structural buttons. Labels are memoized per title tuple.
+    tab_names = _challenge_tab_names(
+        tuple(challenge.get("title") or f"Challenge {i+1}"
+              for i, challenge in enumerate(challenges))
+    )
+
     tabs = st.tabs(tab_names)
     
     # Render existing challenges
@@ -1058,10 +1273,16 @@ def _render_challenges_tabs(journey, chapter_num):
                 "completed": False,
                 "depends_on": []
             })
-            st.rerun()
+            st.rerun(scope="fragment")
 
+@st.fragment
 def _render_single_challenge_form(journey, chapter_num, challenge_idx, challenge):
-    """Render form for a single challenge"""
+    """Render form for a single challenge.
+
+    Runs as a nested fragment so image/code toggle interactions rerun only
+    this challenge. Structural buttons rerun with scope="app" because they
+    change the tab set owned by the enclosing chapter editor.
+    """
     challenges = journey["chapters"][chapter_num]["challenges"]
     is_first = challenge_idx == 0
     is_last = challenge_idx == len(challenges) - 1
@@ -1072,17 +1293,17 @@ def _render_single_challenge_form(journey, chapter_num, challenge_idx, challenge
         disabled = len(challenges) <= 1
         if st.button("🗑️", key=f"delete_challenge_{chapter_num}_{challenge_idx}", help="Delete", type="tertiary", disabled=disabled):
             challenges.pop(challenge_idx)
-            st.rerun()
+            st.rerun(scope="app")
     
     with col2:
         if st.button("⬅️", key=f"moveleft_challenge_{chapter_num}_{challenge_idx}", help="Move left", type="tertiary", disabled=is_first):
             challenges[challenge_idx], challenges[challenge_idx-1] = challenges[challenge_idx-1], challenges[challenge_idx]
-            st.rerun()
+            st.rerun(scope="app")
     
     with col3:
         if st.button("➡️", key=f"moveright_challenge_{chapter_num}_{challenge_idx}", help="Move right", type="tertiary", disabled=is_last):
             challenges[challenge_idx], challenges[challenge_idx+1] = challenges[challenge_idx+1], challenges[challenge_idx]
-            st.rerun()
+            st.rerun(scope="app")
     
     with col4:
         if st.button("📋", key=f"duplicate_challenge_{chapter_num}_{challenge_idx}", help="Duplicate", type="tertiary"):
@@ -1094,52 +1315,18 @@ def _render_single_challenge_form(journey, chapter_num, challenge_idx, challenge
                 "depends_on": challenge.get("depends_on", [])
             }
             challenges.insert(challenge_idx + 1, new_challenge)
-            st.rerun()
-    
-    c1, c2, c3 = st.columns([40, 30, 30])
-    with c1:
-        challenge["title"] = st.text_input(
-            "Challenge title",
-            value=challenge.get("title", ""),
-            key=f"challenge_title_{chapter_num}_{challenge_idx}",
-            help="Short and descriptive challenge name"
-        )
-    
-    with c2:
-        difficulty_options = ["easy", "medium", "hard", "extreme"]
-        challenge["difficulty"] = st.selectbox(
-            "Challenge difficulty",
-            options=difficulty_options,
-            index=difficulty_options.index(challenge.get("difficulty", "easy")),
-            key=f"challenge_difficulty_{chapter_num}_{challenge_idx}",
-            help="Difficulty and impact on XP"
-        )
+            st.rerun(scope="app")
     
-    with c3:
-        depends_on_str = st.text_input(
-            "Depends on",
-            value=",".join(challenge.get("depends_on", [])),
-            key=f"challenge_depends_on_{chapter_num}_{challenge_idx}",
-            help="Achievement IDs required"
-        )
-        # Parse dependencies
-        if depends_on_str.strip():
-            challenge["depends_on"] = [dep.strip() for dep in depends_on_str.split(",") if dep.strip()]
-        else:
-            challenge["depends_on"] = []
-
+    # Title/difficulty/depends_on/description are edited in the chapter's
+    # data_editor table; the tab only holds what a table can't - image,
+    # code and the structural buttons above.
     _render_image_selector(challenge,key=f"{chapter_num}_{challenge_idx}")
-    
-    challenge["description"] = st.text_area(
-        "Detailed description",
-        value=challenge.get("description", ""),
-        key=f"challenge_desc_{chapter_num}_{challenge_idx}",
-        height=120,
-        help="Complete instructions to complete this challenge"
-    )
 
     toggled = st.toggle("Show challenge code", key=f"code_toggle_{chapter_num}_{challenge_idx}")
     if toggled:
+        # Imported lazily so the code_editor component is only loaded when
+        # someone actually opens a code editor, not on every view
+        from core.editor import editor
         st.info("Complete Streamlit code. Access: st, user, avatar, world, chapter_num, new_achievement, validate(bool)")
         challenge["code"] = editor(
             code=challenge.get("code", ""),
@@ -1147,19 +1334,24 @@ def _render_single_challenge_form(journey, chapter_num, challenge_idx, challenge
             key=f"challenge_code_{chapter_num}_{challenge_idx}",
         )
         if challenge.get("code"):
-            try:
-                compile(challenge.get("code", ""), "<challenge_code>", "exec")
-            except SyntaxError as e:
-                st.error(f"Syntax error in challenge code: {e}")
+            err = _challenge_syntax_error(challenge["code"])
+            if err is not None:
+                st.error(f"Syntax error in challenge code: {err}")
 
 def _render_save_controls(journey):
     """Render save controls - always saves to personal collection"""
-    # Validation
-    errors = validate_journey_structure(journey)
+    # Validation - memoized per content digest so reruns that didn't touch
+    # the journey (fragment submits, toggles) skip the full structure walk.
+    # One C-level digest pass is far cheaper than re-walking every chapter.
+    digest = _journey_digest(journey)
+    cached = st.session_state.get("_journey_validation")
+    if cached is not None and cached[0] == digest:
+        errors = cached[1]
+    else:
+        errors = validate_journey_structure(journey)
+        st.session_state._journey_validation = (digest, errors)
     if errors:
-        st.error("Errors detected:")
-        for error in errors:
-            st.write(f"• {error}")
+        st.error("Errors detected:  \n" + "  \n".join(f"• {error}" for error in errors))
     else:
         st.success("Journey valid ✅")
     
@@ -1219,20 +1411,23 @@ def _move_chapter_down(journey, chapter_num):
 
 def _insert_chapter_after(journey, chapter_num):
     """Insert a new chapter after the specified chapter"""
+    # Rebuild in one ordered pass with shifted keys instead of reverse
+    # del+reinsert churn on the live dict
     chapters = journey["chapters"]
-    
-    chapter_numbers = sorted(chapters.keys(), reverse=True)
-    for chapter in chapter_numbers:
-        if chapter > chapter_num:
-            chapters[chapter + 1] = chapters[chapter]
-            del chapters[chapter]
-    
-    chapters[chapter_num + 1] = {
-        "intro": f"Chapter {chapter_num + 1} - Introduction...",
-        "challenges": [],
-        "required_level": 1,
-        "depends_on": []
-    }
+    new_chapters = {}
+    for k in sorted(chapters):
+        if k > chapter_num:
+            new_chapters[k + 1] = chapters[k]
+        else:
+            new_chapters[k] = chapters[k]
+            if k == chapter_num:
+                new_chapters[chapter_num + 1] = {
+                    "intro": f"Chapter {chapter_num + 1} - Introduction...",
+                    "challenges": [],
+                    "required_level": 1,
+                    "depends_on": []
+                }
+    journey["chapters"] = new_chapters
 
 def _renumber_chapters(journey):
     """Renumber all chapters to be consecutive starting from 1"""
@@ -1246,7 +1441,7 @@ def _renumber_chapters(journey):
 def render_editor(user: dict):
     """Main editor page"""
     mode = _render_editor_header()
-    
+
     if "editing_journey" not in st.session_state:
         if mode == "New journey":
             _render_new_journey_form()
@@ -1254,4 +1449,30 @@ def render_editor(user: dict):
             _render_existing_journey_selector()
     else:
         journey = st.session_state.editing_journey
-        _render_journey_editor(journey)
\ No newline at end of file
+        _render_journey_editor(journey)
+
+# ---------------------------- View Routing ---------------------------- #
+
+def _fragment_view(render):
+    """Wrap a view renderer in a fragment so reruns stay scoped to the view"""
+    @st.fragment
+    def wrapper(user):
+        st.session_state._in_fragment = True
+        try:
+            render(user)
+            check_rerun()
+        finally:
+            st.session_state._in_fragment = False
+    return wrapper
+
+# Fragment-wrapped view entry points, built once at import time (module
+# import is cached by the script runner).
+view_auth = _fragment_view(render_auth)
+view_journey_start = _fragment_view(render_journey_start)
+view_intro = _fragment_view(render_intro)
+view_chapter = _fragment_view(render_chapter_view)  # Renommé: "day" → "chapter"
+view_chapters = _fragment_view(render_chapters_view)
+view_challenge = _fragment_view(render_challenge_view)
+view_journey_failed = _fragment_view(render_journey_failed)
+view_journey_completed = _fragment_view(render_journey_completed)
+view_editor = _fragment_view(render_editor)
\ No newline at end of file
@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 from tinydb import TinyDB, Query
+from tinydb.storages import JSONStorage
+from tinydb.middlewares import CachingMiddleware
 import os
 
+# Optional fast path for Mongo key normalization
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class DatabaseInterface(ABC):
     """Abstract interface for user data storage"""
     
@@ -25,18 +33,23 @@ class TinyDBDatabase(DatabaseInterface):
     """TinyDB implementation"""
     
     def __init__(self, db_path: str = "on_a_journey_db.json"):
-        self.db = TinyDB(db_path)
+        # CachingMiddleware keeps the parsed document in memory, so lookups
+        # don't re-read and re-parse the JSON file on every rerun. Writes are
+        # flushed explicitly below to keep the file durable.
+        self.db = TinyDB(db_path, storage=CachingMiddleware(JSONStorage))
         self.users_table = self.db.table("users")
-    
+
     def get_user(self, username: str) -> Optional[Dict[str, Any]]:
         return self.users_table.get(Query().username == username)
-    
+
     def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         self.users_table.insert(user_data)
+        self.db.storage.flush()
         return user_data
-    
+
     def update_user(self, user_data: Dict[str, Any]) -> None:
         self.users_table.update(user_data, Query().username == user_data["username"])
+        self.db.storage.flush()
 
 class MongoDatabase(DatabaseInterface):
     """MongoDB implementation"""
@@ -44,12 +57,24 @@ class MongoDatabase(DatabaseInterface):
     def __init__(self, connection_string: str, database_name: str = "on_a_journey"):
         try:
             from pymongo import MongoClient
+            from pymongo.server_api import ServerApi
         except ImportError:
             raise ImportError("pymongo is required for MongoDB support. Install with: pip install pymongo")
-        
-        self.client = MongoClient(connection_string)
+
+        # Stable API pins server behavior; compressors shrink large journey
+        # payloads on the wire (pymongo skips any whose library is missing,
+        # zlib is always available as the floor)
+        self.client = MongoClient(
+            connection_string,
+            server_api=ServerApi('1'),
+            compressors="zstd,snappy,zlib",
+            maxPoolSize=20,
+        )
         self.db = self.client[database_name]
         self.users_collection = self.db.users
+        # Last document written per username, used to diff subsequent
+        # updates down to changed fields instead of full replaces
+        self._last_written: Dict[str, Dict[str, Any]] = {}
         
         # Test connection and create index
         try:
@@ -64,10 +89,20 @@ class MongoDatabase(DatabaseInterface):
             raise
     
     def _normalize_for_mongo(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert integer keys to strings for MongoDB compatibility"""
+        """Convert integer keys to strings for MongoDB compatibility.
+
+        With orjson installed this is a single C-level serialize/parse
+        round-trip (OPT_NON_STR_KEYS stringifies nested integer keys)
+        instead of a recursive Python walk allocating a dict per level.
+        """
         if not isinstance(data, dict):
             return data
-        
+
+        if orjson is not None:
+            return orjson.loads(
+                orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS, default=str)
+            )
+
         normalized = {}
         for key, value in data.items():
             # Convert integer keys to strings
@@ -89,16 +124,42 @@ class MongoDatabase(DatabaseInterface):
     def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         normalized_data = self._normalize_for_mongo(user_data)
         self.users_collection.insert_one(normalized_data)
+        normalized_data.pop('_id', None)
+        self._last_written[user_data["username"]] = normalized_data
         return user_data  # Return original structure
-    
+
     def update_user(self, user_data: Dict[str, Any]) -> None:
         username = user_data["username"]
         normalized_data = self._normalize_for_mongo(user_data)
         # Remove _id if present
         normalized_data.pop('_id', None)
-        
+
+        # Diff against the last document we wrote and send only changed
+        # top-level fields: most updates touch a couple of fields (avatar,
+        # world, progress) while the journey structure dominates the payload
+        previous = self._last_written.get(username)
+        self._last_written[username] = normalized_data
+
+        if previous is not None:
+            missing = object()
+            changed = {k: v for k, v in normalized_data.items()
+                       if previous.get(k, missing) != v}
+            removed = [k for k in previous if k not in normalized_data]
+            if not changed and not removed:
+                return
+            # Small diffs go as partial updates; near-full rewrites are
+            # cheaper as a single replace
+            if len(changed) + len(removed) <= len(normalized_data) // 2:
+                update: Dict[str, Any] = {}
+                if changed:
+                    update["$set"] = changed
+                if removed:
+                    update["$unset"] = {k: "" for k in removed}
+                self.users_collection.update_one({"username": username}, update)
+                return
+
         self.users_collection.replace_one(
-            {"username": username}, 
+            {"username": username},
             normalized_data,
             upsert=False
         )
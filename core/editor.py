@@ -20,16 +20,20 @@ class code_editor_output_parser:
         self.editors={}
 
     def __call__(self,output,key):
-        last_id=self.editors.setdefault(key,{}).get('last_id')
-        last_code=self.editors.setdefault(key,{}).get('last_code',"")
+        # Resolve the entry once instead of one setdefault per field
+        entry=self.editors.get(key)
+        if entry is None:
+            entry=self.editors[key]={}
+        last_id=entry.get('last_id')
+        last_code=entry.get('last_code',"")
         if output is None:
             event=None
             content=last_code
         else:
             content=output['text']
             if not output['id']==last_id:
-                self.editors[key]['last_code']=output['text']
-                self.editors[key]['last_id']=output['id']
+                entry['last_code']=output['text']
+                entry['last_id']=output['id']
                 if not output["type"]=='':
                     event=output["type"]
                 else:
@@ -160,10 +164,30 @@ def button(caption="",icon="Play",event="Play",icon_size="16px", style=None, hov
         }
         return button  
     
+# Default widget configuration, built once at import. Treated as read-only:
+# editor() copies before applying any per-call override.
+_DEFAULT_OPTIONS={
+    "showLineNumbers":True
+}
+
+_DEFAULT_PROPS={
+    "enableBasicAutocompletion": False,
+    "enableLiveAutocompletion": False,
+    "enableSnippets": False,
+}
+
+_DEFAULT_BUTTONS=[{
+    "name": "Copy",
+    "feather": "Copy",
+    "alwaysOn": False,
+    "commands": ["copyAll"],
+    "style": {"top": "0.46rem", "right": "0.4rem"}
+}]
+
 def editor(code="",lang="python",key=None,**kwargs):
     if not key:
         raise ValueError("No key provided. You must pass a unique key to the editor widget.")
-    
+
     if 'code_editor_output_parser' not in st.session_state:
         st.session_state.code_editor_output_parser=code_editor_output_parser()
     parser=st.session_state.code_editor_output_parser
@@ -176,28 +200,19 @@ def editor(code="",lang="python",key=None,**kwargs):
 
     borders=f"{top_borders} {bot_borders}"
 
-    options={
-        "showLineNumbers":True
-    }
-
-    props={ 
-        "enableBasicAutocompletion": False, 
-        "enableLiveAutocompletion": False, 
-        "enableSnippets": False,
-    }
+    custom_options=kwargs.pop('options',None)
+    options={**_DEFAULT_OPTIONS,**custom_options} if custom_options else _DEFAULT_OPTIONS
 
-    buttons=kwargs.pop('buttons',None) or [{
-        "name": "Copy",
-        "feather": "Copy",
-        "alwaysOn": False,
-        "commands": ["copyAll"],
-        "style": {"top": "0.46rem", "right": "0.4rem"}
-    }]
+    custom_props=kwargs.pop('props',None)
+    props={**_DEFAULT_PROPS,**custom_props} if custom_props else dict(_DEFAULT_PROPS)
 
-    options.update(kwargs.pop('options',{}))
-    props.update(kwargs.pop('props',{}))
+    buttons=kwargs.pop('buttons',None) or _DEFAULT_BUTTONS
 
-    props.setdefault('style',{}).update(borderRadius=borders)
+    # props is always a fresh dict here, so the style write can't leak into
+    # the shared defaults
+    style=dict(props.get('style') or {})
+    style['borderRadius']=borders
+    props['style']=style
 
     handlers={k:v for k,v in kwargs.items() if isinstance(k,str) and k.startswith('on_')}
     rest={k:v for k,v in kwargs.items() if not (isinstance(k,str) and k.startswith('on_'))}